@@ -7,6 +7,59 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int
     RIOT_API_KEY: str
     
+    # Pools de connexions à la base (moteurs sync et async, un pool chacun)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800
+    
+    # Hachage bcrypt sur un pool de process dédié (file bornée, rejet 503 au-delà)
+    PASSWORD_HASH_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 32
+    
+    # Cache des utilisateurs authentifiés (secondes) : invalidé localement à chaque modification,
+    # les autres process voient le changement au plus tard après ce délai
+    AUTH_PRINCIPAL_CACHE_TTL: int = 60
+    AUTH_PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    
+    # Client HTTP Riot (connexions keep-alive par hôte régional)
+    RIOT_POOL_SIZE: int = 10
+    RIOT_MAX_WORKERS: int = 5
+    RIOT_TIMEOUT: float = 10.0
+    
+    # Limites appliquées avant le premier en-tête X-App-Rate-Limit reçu (clé de dev par défaut)
+    RIOT_APP_RATE_LIMIT: str = "20:1,100:120"
+    RIOT_MAX_RETRIES: int = 3
+    
+    # Cache des recherches Riot (secondes) : riot id -> puuid, invocateur et classement
+    RIOT_ACCOUNT_CACHE_TTL: int = 86400
+    RIOT_SUMMONER_CACHE_TTL: int = 300
+    RIOT_CACHE_STALE_SECONDS: int = 3600
+    RIOT_CACHE_MAX_ENTRIES: int = 10000
+    # Nombre maximal de riot ids par appel à /riot/summoners:batch
+    RIOT_SUMMONER_BATCH_MAX: int = 20
+    
+    # Stockage des payloads bruts de matchs (LRU mémoire + disque)
+    MATCH_STORE_DIR: str = "data/matches"
+    MATCH_STORE_MEMORY_MB: int = 64
+    
+    # Synchronisation des matchs en arrière-plan
+    SYNC_ENABLED: bool = True
+    SYNC_INTERVAL_SECONDS: int = 300
+    SYNC_WORKERS: int = 4
+    SYNC_MATCH_COUNT: int = 20
+    
+    # Backfill de l'historique complet à la liaison d'un compte
+    BACKFILL_PAGE_SIZE: int = 100
+    BACKFILL_WORKERS: int = 1
+    # Un job "running" sans progression depuis ce délai est repris par un autre process
+    BACKFILL_LEASE_SECONDS: int = 600
+    
+    # Cache des réponses /games/* par utilisateur (invalidé par User.data_generation)
+    RESPONSE_CACHE_MB: int = 32
+    
     class Config:
         env_file = ".env"
         
@@ -1,8 +1,148 @@
-from sqlalchemy import create_engine
+import time
+from threading import Lock
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.core.config import settings
+from app.core.metrics import instrument_engine
 
-engine = create_engine(settings.DATABASE_URL)
+# Pilote asynchrone utilisé par les routes pour chaque backend
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+def async_database_url(url: str):
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername))
+
+
+class PoolMetrics:
+    """
+    Attente pour obtenir une connexion du pool, et timeouts (pool épuisé).
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float, timed_out: bool):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def stats(self) -> dict:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait / attempts * 1000, 3) if attempts else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3)
+            }
+
+
+class TimedPoolMixin:
+    # Métriques portées par la classe : conservées quand le pool est recréé (dispose)
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.record(time.perf_counter() - start, timed_out=False)
+        return connection
+
+
+class TimedQueuePool(TimedPoolMixin, QueuePool):
+    metrics = PoolMetrics()
+
+
+class TimedAsyncQueuePool(TimedPoolMixin, AsyncAdaptedQueuePool):
+    metrics = PoolMetrics()
+
+
+def pool_options(url: str, poolclass) -> dict:
+    """
+    Réglages de pool communs aux deux moteurs (chacun a son propre pool :
+    jusqu'à 2 x (DB_POOL_SIZE + DB_MAX_OVERFLOW) connexions au total).
+    Une base SQLite en mémoire garde le pool par défaut de SQLAlchemy.
+    """
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE
+    }
+
+
+engine = create_engine(settings.DATABASE_URL, **pool_options(settings.DATABASE_URL, TimedQueuePool))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
+
+# Routes HTTP : moteur asynchrone sur la même base (une base SQLite en mémoire n'est pas partagée).
+# Les workers d'arrière-plan, les migrations et les scripts restent sur le moteur synchrone.
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL),
+    **pool_options(settings.DATABASE_URL, TimedAsyncQueuePool)
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+instrument_engine(engine, "sync")
+instrument_engine(async_engine.sync_engine, "async")
+
+async def get_async_db():
+    # Seule dépendance de session : FastAPI la met en cache par requête,
+    # get_current_user et la route partagent donc la même session (et connexion)
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def pool_stats() -> dict:
+    """
+    État des pools de connexions (sync : workers d'arrière-plan, async : routes).
+    """
+    stats = {}
+    for name, pool in [("sync", engine.pool), ("async", async_engine.pool)]:
+        if isinstance(pool, TimedPoolMixin):
+            stats[name] = {
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                # overflow() est négatif tant que le pool n'est pas plein : connexions en débordement
+                "overflow": max(pool.overflow(), 0),
+                # Pools chronométrés : toujours construits par pool_options, depuis les settings
+                "max_overflow": settings.DB_MAX_OVERFLOW,
+                "timeout": pool.timeout(),
+                **pool.metrics.stats()
+            }
+        else:
+            stats[name] = {"status": pool.status()}
+    return stats
+
+def dialect_insert(db, model):
+    """
+    INSERT natif du dialecte (PostgreSQL / SQLite) pour accéder à ON CONFLICT.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Dialecte non supporté pour ON CONFLICT : {dialect}")
+    return insert(model)
\ No newline at end of file
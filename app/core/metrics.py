@@ -0,0 +1,214 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from threading import Lock
+from typing import List, Sequence, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Bornes des histogrammes de latence, en secondes
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Tuple, extra: str = "") -> str:
+    labels = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        labels.append(extra)
+    return "{" + ",".join(labels) + "}" if labels else ""
+
+
+def _format_value(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """
+    Compteur monotone par combinaison de labels (tuple de valeurs, dans l'ordre de labelnames).
+    """
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = Lock()
+
+    def inc(self, labels: Tuple = (), amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in values
+        ]
+
+
+class Histogram:
+    """
+    Histogramme à bornes fixes : un compteur par intervalle, cumulés seulement à l'export.
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = Lock()
+
+    def observe(self, labels: Tuple, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # [compteurs par intervalle (+Inf en dernier), somme]
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            series = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+
+        lines = []
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                bucket_labels = _format_labels(self.labelnames, labels, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Métriques du processus, exportées au format texte Prometheus sur /metrics.
+    L'enregistrement ne coûte qu'un verrou et une addition : l'export fait le reste.
+    """
+
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "Durée des requêtes HTTP par route et statut",
+    ["method", "route", "status"]
+)
+http_request_sql_statements = registry.histogram(
+    "http_request_sql_statements",
+    "Nombre de requêtes SQL exécutées par requête HTTP",
+    ["route"],
+    buckets=STATEMENT_BUCKETS
+)
+http_request_sql_duration = registry.histogram(
+    "http_request_sql_duration_seconds",
+    "Temps passé en SQL par requête HTTP",
+    ["route"]
+)
+sql_statement_duration = registry.histogram(
+    "db_statement_duration_seconds",
+    "Durée des requêtes SQL par moteur (sync : workers d'arrière-plan, async : routes)",
+    ["engine"]
+)
+
+# Compteurs SQL [requêtes, secondes] de la requête HTTP en cours (hors requête : None).
+# Les threads de run_in_threadpool et les greenlets de run_sync héritent du contexte.
+_request_sql: ContextVar = ContextVar("request_sql", default=None)
+
+
+def instrument_engine(engine: Engine, name: str):
+    """
+    Chronomètre chaque requête SQL du moteur, et l'impute à la requête HTTP en cours.
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        sql_statement_duration.observe((name,), elapsed)
+        tracker = _request_sql.get()
+        if tracker is not None:
+            tracker[0] += 1
+            tracker[1] += elapsed
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        # Requête en erreur : after_cursor_execute n'est pas appelé
+        if context.connection is not None and context.connection.info.get("query_start"):
+            context.connection.info["query_start"].pop()
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI : latence par gabarit de route (/riot/match/{match_id}, pas l'URL brute),
+    méthode et statut, plus le nombre et le temps des requêtes SQL de chaque requête.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        sql = [0, 0.0]
+        token = _request_sql.set(sql)
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_sql.reset(token)
+            # Le routeur renseigne la route trouvée dans le scope ; sinon un seul label pour tous les 404
+            route = scope.get("route")
+            template = getattr(route, "path_format", None) or "unmatched"
+            http_request_duration.observe((scope["method"], template, str(status)), elapsed)
+            http_request_sql_statements.observe((template,), sql[0])
+            http_request_sql_duration.observe((template,), sql[1])
@@ -0,0 +1,204 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime, LargeBinary, MetaData, String, Table, bindparam, inspect, null, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+# Migrations minimales appliquées au démarrage (à remplacer par Alembic plus tard).
+# create_all crée les nouvelles tables, les migrations adaptent les tables existantes.
+metadata = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations",
+    metadata,
+    Column("name", String, primary_key=True),
+    Column("applied_at", DateTime, nullable=False)
+)
+
+
+def matches_unique_per_player(conn: Connection):
+    # match_id n'est plus unique seul : une ligne par (match, joueur)
+    conn.execute(text("DROP INDEX IF EXISTS ix_matches_match_id"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_matches_match_id ON matches (match_id)"))
+    conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS uq_matches_match_id_puuid ON matches (match_id, puuid)"))
+
+
+def backfill_match_details(conn: Connection):
+    # Remplit match_units / match_traits à partir des colonnes JSON existantes
+    from app.models.match import Match
+    from app.models.match_unit import MatchUnit
+    from app.models.match_trait import MatchTrait
+    from app.services.riot_service import build_detail_rows
+
+    matches = Match.__table__
+    last_pk = 0
+    while True:
+        batch = conn.execute(
+            select(matches.c.id, matches.c.traits, matches.c.units)
+            .where(matches.c.id > last_pk)
+            .order_by(matches.c.id)
+            .limit(1000)
+        ).fetchall()
+        if not batch:
+            return
+
+        unit_rows, trait_rows = [], []
+        for match_pk, traits, units in batch:
+            match_units, match_traits = build_detail_rows(match_pk, traits, units)
+            unit_rows.extend(match_units)
+            trait_rows.extend(match_traits)
+        if unit_rows:
+            conn.execute(MatchUnit.__table__.insert(), unit_rows)
+        if trait_rows:
+            conn.execute(MatchTrait.__table__.insert(), trait_rows)
+        last_pk = batch[-1].id
+
+
+def build_user_stats(conn: Connection):
+    from app.services.aggregate_service import rebuild_user_aggregates
+
+    # Le modèle courant lit matches.board : la colonne doit exister avant toute reconstruction
+    add_match_board_column(conn)
+    rebuild_user_aggregates(Session(bind=conn))
+
+
+def add_match_derived_columns(conn: Connection):
+    # Colonnes dérivées du classifieur de composition, recalculées pour l'existant
+    from app.models.match import Match
+    from app.services.composition import classify_traits, parse_patch
+    from app.services.match_store import match_store
+
+    existing = {column["name"] for column in inspect(conn).get_columns("matches")}
+    for name, ddl, indexed in [
+        ("stats_key", "VARCHAR", True),
+        ("top4", "BOOLEAN", False),
+        ("set_number", "INTEGER", True),
+        ("patch", "VARCHAR", True),
+    ]:
+        if name not in existing:
+            conn.execute(text(f"ALTER TABLE matches ADD COLUMN {name} {ddl}"))
+        if indexed:
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_matches_{name} ON matches ({name})"))
+
+    matches = Match.__table__
+    update = (
+        matches.update()
+        .where(matches.c.id == bindparam("pk"))
+        .values(
+            stats_key=bindparam("stats_key"),
+            top4=bindparam("top4"),
+            set_number=bindparam("set_number"),
+            patch=bindparam("patch")
+        )
+    )
+
+    last_pk = 0
+    while True:
+        batch = conn.execute(
+            select(matches.c.id, matches.c.match_id, matches.c.placement, matches.c.traits)
+            .where(matches.c.id > last_pk)
+            .order_by(matches.c.id)
+            .limit(1000)
+        ).fetchall()
+        if not batch:
+            break
+
+        values = []
+        for match_pk, match_id, placement, traits in batch:
+            composition = classify_traits(traits)
+            # Le patch n'est connu que si le payload brut est encore dans le store
+            info = (match_store.get(match_id) or {}).get("info", {})
+            values.append({
+                "pk": match_pk,
+                "stats_key": composition.stats_key,
+                "top4": placement is not None and placement <= 4,
+                "set_number": info.get("tft_set_number") or composition.set_number,
+                "patch": parse_patch(info.get("game_version"))
+            })
+        conn.execute(update, values)
+        last_pk = batch[-1].id
+
+    # Les clés de composition suivent désormais le classifieur canonique
+    build_user_stats(conn)
+
+
+def add_history_index(conn: Connection):
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_matches_user_id_played_at "
+        "ON matches (user_id, played_at DESC, id DESC)"
+    ))
+
+
+def add_match_board_column(conn: Connection):
+    existing = {column["name"] for column in inspect(conn).get_columns("matches")}
+    if "board" not in existing:
+        conn.execute(text(f"ALTER TABLE matches ADD COLUMN board {LargeBinary().compile(dialect=conn.dialect)}"))
+
+
+def encode_match_boards(conn: Connection):
+    # Réencode traits / units JSON en plateaux compacts, puis vide les colonnes JSON
+    from app.models.match import Match
+    from app.services.catalog import catalog
+
+    add_match_board_column(conn)
+
+    matches = Match.__table__
+    update = (
+        matches.update()
+        .where(matches.c.id == bindparam("pk"))
+        # null() : None sur une colonne JSON écrirait le littéral JSON 'null'
+        .values(board=bindparam("encoded"), traits=null(), units=null())
+    )
+
+    last_pk = 0
+    while True:
+        batch = conn.execute(
+            select(matches.c.id, matches.c.traits, matches.c.units)
+            .where(matches.c.id > last_pk, matches.c.board.is_(None))
+            .order_by(matches.c.id)
+            .limit(1000)
+        ).fetchall()
+        if not batch:
+            return
+
+        boards = catalog.encode_boards([(traits, units) for _, traits, units in batch], conn)
+        conn.execute(update, [{"pk": row.id, "encoded": board} for row, board in zip(batch, boards)])
+        last_pk = batch[-1].id
+
+
+def add_user_data_generation(conn: Connection):
+    existing = {column["name"] for column in inspect(conn).get_columns("users")}
+    if "data_generation" not in existing:
+        conn.execute(text("ALTER TABLE users ADD COLUMN data_generation INTEGER NOT NULL DEFAULT 0"))
+
+
+MIGRATIONS = [
+    ("0001_matches_unique_per_player", matches_unique_per_player),
+    ("0002_backfill_match_details", backfill_match_details),
+    ("0003_build_user_stats", build_user_stats),
+    ("0004_match_derived_columns", add_match_derived_columns),
+    ("0005_history_index", add_history_index),
+    # Même reconstruction que 0003, qui alimente aussi user_daily_stats
+    ("0006_build_user_daily_stats", build_user_stats),
+    ("0007_encode_match_boards", encode_match_boards),
+    ("0008_user_data_generation", add_user_data_generation),
+]
+
+
+def run_migrations(engine: Engine, fresh_database: bool):
+    """
+    Applique les migrations en attente, chacune dans sa transaction.
+    Une base neuve est déjà au bon schéma via create_all : tout est marqué appliqué.
+    """
+    metadata.create_all(bind=engine)
+
+    with engine.begin() as conn:
+        applied = {row.name for row in conn.execute(schema_migrations.select())}
+
+    for name, migration in MIGRATIONS:
+        if name in applied:
+            continue
+        with engine.begin() as conn:
+            if not fresh_database:
+                migration(conn)
+                print(f"Migration appliquée : {name}")
+            conn.execute(schema_migrations.insert().values(name=name, applied_at=datetime.utcnow()))
@@ -1,21 +1,55 @@
+from dataclasses import dataclass
+from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from app.core.config import settings
-from app.core.database import SessionLocal
+from app.core.database import get_async_db
 from app.models.user import User
+from app.services.ttl_cache import TTLCache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-        
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+@dataclass(frozen=True)
+class Principal:
+    """
+    Utilisateur authentifié vu par les routes : instantané immuable, partagé via le cache.
+    """
+    id: int
+    username: str
+    email: str
+    role: str
+    game_name: Optional[str]
+    tag_line: Optional[str]
+    puuid: Optional[str]
+    region: Optional[str]
+    data_generation: int
+    
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            role=user.role.name,
+            game_name=user.game_name,
+            tag_line=user.tag_line,
+            puuid=user.puuid,
+            region=user.region,
+            data_generation=user.data_generation
+        )
+
+# Invalidé à chaque modification de l'utilisateur (rôle, compte Riot, suppression, nouveaux matchs)
+principal_cache = TTLCache(
+    ttl=settings.AUTH_PRINCIPAL_CACHE_TTL,
+    stale_ttl=0,
+    max_entries=settings.AUTH_PRINCIPAL_CACHE_MAX_ENTRIES
+)
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> Principal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Token invalide ou utilisateur non authentifié",
@@ -24,25 +58,40 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        username = str = payload.get("sub")
+        username = payload.get("sub")
         if username is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
     
-    user = db.query(User).filter(User.username == username).first()
-    if user is None:
+    # Claim uid : lookup du cache par id, aucune requête si l'utilisateur est en cache
+    user_id = payload.get("uid")
+    principal = principal_cache.get(user_id) if user_id is not None else None
+    if principal is None:
+        query = select(User).options(selectinload(User.role))
+        if user_id is not None:
+            query = query.filter(User.id == user_id)
+        else:
+            # Token émis avant l'ajout des claims uid / role
+            query = query.filter(User.username == username)
+        user = (await db.execute(query)).scalars().first()
+        if user is None:
+            raise credentials_exception
+        principal = Principal.from_user(user)
+        principal_cache.put(principal.id, principal)
+    
+    # Un token émis avant un changement de rôle n'est plus accepté
+    if principal.username != username or payload.get("role", principal.role) != principal.role:
         raise credentials_exception
     
-    return user
+    return principal
 
 def require_role(required_role: str):
-    def role_dependency(current_user: User = Depends(get_current_user)):
-        if current_user.role.name != required_role:
+    async def role_dependency(current_user: Principal = Depends(get_current_user)):
+        if current_user.role != required_role:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Accès réservé aux utilisateurs avec le rôle '{required_role}'."
             )
         return current_user
-    return role_dependency
-        
\ No newline at end of file
+    return role_dependency
\ No newline at end of file
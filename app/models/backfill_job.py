@@ -0,0 +1,23 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from app.core.database import Base
+
+class BackfillJob(Base):
+    __tablename__ = "backfill_jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), unique=True, nullable=False)
+    puuid = Column(String, nullable=False)
+    region = Column(String, nullable=False)
+    
+    # pending | running | done | error | cancelled (compte délié)
+    status = Column(String, nullable=False, default="pending")
+    
+    # Checkpoint : offset `start` de la prochaine page d'ids à demander
+    next_start = Column(Integer, nullable=False, default=0)
+    matches_seen = Column(Integer, nullable=False, default=0)
+    matches_inserted = Column(Integer, nullable=False, default=0)
+    error = Column(String, nullable=True)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
\ No newline at end of file
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, UniqueConstraint
+from app.core.database import Base
+
+class CatalogEntry(Base):
+    """
+    Dictionnaire des identifiants Riot (unités, items, traits) vers de petits entiers,
+    utilisés par l'encodage compact des plateaux (Match.board).
+    """
+    __tablename__ = "catalog_entries"
+    __table_args__ = (
+        UniqueConstraint("kind", "name", name="uq_catalog_entries_kind_name"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    kind = Column(String, nullable=False)
+    name = Column(String, nullable=False)
\ No newline at end of file
@@ -1,12 +1,16 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, JSON, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, JSON, DateTime, Boolean, Index, LargeBinary, UniqueConstraint
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
 class Match(Base):
     __tablename__ = "matches"
+    # Une ligne par joueur lié présent dans le lobby
+    __table_args__ = (
+        UniqueConstraint("match_id", "puuid", name="uq_matches_match_id_puuid"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    match_id = Column(String, unique=True, index=True, nullable=False)
+    match_id = Column(String, index=True, nullable=False)
     puuid = Column(String, nullable=False)
     placement = Column(Integer)
     level = Column(Integer)
@@ -14,10 +18,40 @@ class Match(Base):
     last_round = Column(Integer)
     
     composition_name = Column(String, nullable=True)
-    traits = Column(JSON)
-    units = Column(JSON)
+    # Plateau encodé via le catalogue (voir services/catalog.py)
+    board = Column(LargeBinary, nullable=True)
+    # Ancien stockage JSON, vidé par la migration 0007 (lecture seule)
+    legacy_traits = Column("traits", JSON, nullable=True)
+    legacy_units = Column("units", JSON, nullable=True)
     
     played_at = Column(DateTime, index=True)
     
+    # Dérivés à l'ingestion (classifieur canonique de composition, voir services/composition.py)
+    stats_key = Column(String, index=True, nullable=True)
+    top4 = Column(Boolean, nullable=True)
+    set_number = Column(Integer, index=True, nullable=True)
+    patch = Column(String, index=True, nullable=True)
+    
     user_id = Column(Integer, ForeignKey("users.id"))
-    user = relationship("User", back_populates="matches")
\ No newline at end of file
+    user = relationship("User", back_populates="matches")
+    
+    @property
+    def traits(self):
+        return self._decoded_board()[0]
+    
+    @property
+    def units(self):
+        return self._decoded_board()[1]
+    
+    def _decoded_board(self):
+        from app.services.catalog import match_board
+        
+        # Décodé une seule fois par instance (traits et units lisent le même plateau)
+        cached = getattr(self, "_board_cache", None)
+        if cached is None or cached[0] is not self.board:
+            cached = self._board_cache = (self.board, match_board(self.board, self.legacy_traits, self.legacy_units))
+        return cached[1]
+
+
+# Pagination par curseur de l'historique : (user_id, played_at DESC, id DESC)
+Index("ix_matches_user_id_played_at", Match.user_id, Match.played_at.desc(), Match.id.desc())
\ No newline at end of file
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+from app.core.database import Base
+
+class MatchTrait(Base):
+    __tablename__ = "match_traits"
+    __table_args__ = (
+        Index("ix_match_traits_name_match_pk", "name", "match_pk"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    match_pk = Column(Integer, ForeignKey("matches.id", ondelete="CASCADE"), index=True, nullable=False)
+    name = Column(String, nullable=False)
+    tier_current = Column(Integer)
+    num_units = Column(Integer)
\ No newline at end of file
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, JSON, Index
+from app.core.database import Base
+
+class MatchUnit(Base):
+    __tablename__ = "match_units"
+    __table_args__ = (
+        Index("ix_match_units_character_id_match_pk", "character_id", "match_pk"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    match_pk = Column(Integer, ForeignKey("matches.id", ondelete="CASCADE"), index=True, nullable=False)
+    character_id = Column(String, nullable=False)
+    tier = Column(Integer)
+    items = Column(JSON)
\ No newline at end of file
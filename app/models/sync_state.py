@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from app.core.database import Base
+
+class SyncState(Base):
+    __tablename__ = "sync_states"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    
+    # Curseur : date du dernier match ingéré pour cet utilisateur
+    last_played_at = Column(DateTime, nullable=True)
+    
+    last_sync_at = Column(DateTime, nullable=True, index=True)
+    last_status = Column(String, nullable=True)
+    last_error = Column(String, nullable=True)
+    matches_synced = Column(Integer, nullable=False, default=0)
\ No newline at end of file
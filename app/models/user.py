@@ -14,6 +14,8 @@ class User(Base):
     tag_line = Column(String, nullable=True)
     puuid = Column(String, unique=True, nullable=True)
     region = Column(String, nullable=True)
+    # Incrémenté à chaque insertion de matchs : version des réponses en cache
+    data_generation = Column(Integer, nullable=False, default=0, server_default="0")
     
     role = relationship("Role", back_populates="users")
     matches = relationship("Match", back_populates="user")
\ No newline at end of file
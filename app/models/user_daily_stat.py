@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Date
+from app.core.database import Base
+
+class UserDailyStat(Base):
+    """
+    Mêmes agrégats que user_stats, découpés par jour de jeu :
+    une fenêtre de 30 jours fusionne ~30 petites lignes au lieu de relire l'historique.
+    """
+    __tablename__ = "user_daily_stats"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    kind = Column(String, primary_key=True)
+    day = Column(Date, primary_key=True)
+    key = Column(String, primary_key=True)
+    
+    games = Column(Integer, nullable=False, default=0)
+    top4 = Column(Integer, nullable=False, default=0)
+    placement_sum = Column(Integer, nullable=False, default=0)
\ No newline at end of file
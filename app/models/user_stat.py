@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, ForeignKey
+from app.core.database import Base
+
+class UserStat(Base):
+    """
+    Agrégats par utilisateur, maintenus à l'ingestion.
+    kind : "composition" | "unit" | "trait", key : clé de composition, character_id ou nom de trait.
+    """
+    __tablename__ = "user_stats"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    kind = Column(String, primary_key=True)
+    key = Column(String, primary_key=True)
+    
+    games = Column(Integer, nullable=False, default=0)
+    top4 = Column(Integer, nullable=False, default=0)
+    placement_sum = Column(Integer, nullable=False, default=0)
\ No newline at end of file
@@ -1,23 +1,25 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.core.security import require_role
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.core.security import Principal, principal_cache, require_role
 from app.schemas.user import UserOut, RoleUpdate
 from app.models.user import User
 from app.models.role import Role
-from app.core.database import SessionLocal
+from app.core.database import get_async_db, pool_stats
+from app.services.riot_client import riot_client
+from app.services.match_store import match_store
+from app.services.riot_service import account_cache, summoner_cache
+from app.services.aggregate_service import rebuild_user_aggregates, bump_data_generation
+from app.services.response_cache import response_cache
+from app.services.password_hasher import password_hasher
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.get("/users", response_model=list[UserOut])
-def get_all_users(db: Session = Depends(get_db), current_user: User = Depends(require_role("admin"))):
-    users = db.query(User).all()
+async def get_all_users(db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(require_role("admin"))):
+    result = await db.execute(select(User).options(selectinload(User.role)))
+    users = result.scalars().all()
     
     result = [
         {
@@ -31,8 +33,9 @@ def get_all_users(db: Session = Depends(get_db), current_user: User = Depends(re
     return result
 
 @router.delete("/users/delete/{user_id}", status_code=200)
-def delete_user(user_id: int, db: Session = Depends(get_db), current_user: User = Depends(require_role("admin"))):
-    user_to_delete = db.query(User).filter(User.id == user_id).first()
+async def delete_user(user_id: int, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(require_role("admin"))):
+    result = await db.execute(select(User).options(selectinload(User.role)).filter(User.id == user_id))
+    user_to_delete = result.scalars().first()
 
     if not user_to_delete:
         raise HTTPException(
@@ -54,13 +57,14 @@ def delete_user(user_id: int, db: Session = Depends(get_db), current_user: User
             detail="Vous ne pouvez pas supprimer un autre administrateur."
         )
 
-    db.delete(user_to_delete)
-    db.commit()
+    await db.delete(user_to_delete)
+    await db.commit()
+    principal_cache.invalidate(user_id)
     return {"detail": f"Utilisateur avec l'ID {user_id} supprimé avec succès."}
 
 @router.put("/users/update/{user_id}/role")
-def update_user_role(user_id: int, data: RoleUpdate, db: Session = Depends(get_db), current_user: User = Depends(require_role("admin"))):
-    user = db.query(User).filter(User.id == user_id).first()
+async def update_user_role(user_id: int, data: RoleUpdate, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(require_role("admin"))):
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="Utilisateur introuvable")
 
@@ -69,12 +73,57 @@ def update_user_role(user_id: int, data: RoleUpdate, db: Session = Depends(get_d
         raise HTTPException(status_code=403, detail="Impossible de modifier votre propre rôle.")
 
     # 🔍 Chercher le rôle demandé
-    role = db.query(Role).filter(Role.name == data.role_name).first()
+    result = await db.execute(select(Role).filter(Role.name == data.role_name))
+    role = result.scalars().first()
     if not role:
         raise HTTPException(status_code=400, detail="Rôle invalide")
 
     user.role_id = role.id
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    # Le prochain appel recharge le rôle : les tokens émis avec l'ancien sont refusés
+    principal_cache.invalidate(user_id)
+
+    return {"detail": f"Rôle de l'utilisateur '{user.username}' mis à jour en '{role.name}'."}
+
+@router.get("/riot/rate-limits")
+async def get_riot_rate_limits(current_user: Principal = Depends(require_role("admin"))):
+    return riot_client.rate_limiter.stats()
+
+@router.get("/riot/coalescing")
+async def get_riot_coalescing_stats(current_user: Principal = Depends(require_role("admin"))):
+    return riot_client.single_flight.stats()
+
+@router.get("/riot/match-store")
+async def get_match_store_stats(current_user: Principal = Depends(require_role("admin"))):
+    return match_store.stats()
 
-    return {"detail": f"Rôle de l'utilisateur '{user.username}' mis à jour en '{role.name}'."}
\ No newline at end of file
+@router.get("/riot/lookup-cache")
+async def get_riot_lookup_cache_stats(current_user: Principal = Depends(require_role("admin"))):
+    return {"accounts": account_cache.stats(), "summoners": summoner_cache.stats()}
+
+@router.get("/auth/hashing")
+async def get_password_hashing_stats(current_user: Principal = Depends(require_role("admin"))):
+    return password_hasher.stats()
+
+@router.get("/db/pool")
+async def get_db_pool_stats(current_user: Principal = Depends(require_role("admin"))):
+    return pool_stats()
+
+@router.get("/cache/responses")
+async def get_response_cache_stats(current_user: Principal = Depends(require_role("admin"))):
+    return response_cache.stats()
+
+@router.post("/stats/rebuild")
+async def rebuild_stats(user_id: int = None, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(require_role("admin"))):
+    def rebuild(session):
+        count = rebuild_user_aggregates(session, user_id)
+        bump_data_generation(session, None if user_id is None else [user_id])
+        session.commit()
+        return count
+    
+    count = await db.run_sync(rebuild)
+    if user_id is None:
+        principal_cache.clear()
+    else:
+        principal_cache.invalidate(user_id)
+    return {"detail": f"Statistiques reconstruites à partir de {count} matchs."}
\ No newline at end of file
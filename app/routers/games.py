@@ -1,118 +1,190 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from collections import Counter
-from app.services.riot_service import compute_stats_by_traits
-from app.core.database import SessionLocal
-from app.core.security import get_current_user
-from app.schemas.game import CompositionStats, UnitStats, TraitStats
-from app.schemas.match import MatchOut
+import json
+import base64
+from functools import lru_cache
+from datetime import datetime
+from typing import Callable, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.services.stats_engine import load_user_columns, unit_item_stats
+from app.services.response_cache import response_cache
+from app.services.catalog import catalog
+from app.services.stats_service import StatsFilters, fetch_stats, fetch_dashboard, format_composition_stats, format_unit_stats, format_trait_stats
+from app.core.database import get_async_db
+from app.core.security import Principal, get_current_user
+from app.schemas.game import CompositionStats, UnitStats, TraitStats, UnitItemStats, DashboardStats
+from app.schemas.match import MatchHistoryPage
 from app.models.match import Match
-from app.models.user import User
 
 router = APIRouter(prefix="/games", tags=["games"])
 
-def get_db ():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    If-None-Match : liste d'ETags séparés par des virgules, ou "*".
+    Comparaison faible (RFC 9110) : W/"x" correspond à "x".
+    """
+    for candidate in (if_none_match or "").split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == "*" or candidate == etag:
+            return True
+    return False
+
+@lru_cache(maxsize=None)
+def response_adapter(response_model) -> TypeAdapter:
+    # Construire un TypeAdapter coûte ~0,3 ms : un seul par modèle de réponse
+    return TypeAdapter(response_model)
+
+async def cached_response(request: Request, current_user: Principal, response_model, compute: Callable) -> Response:
+    """
+    Sert la réponse depuis le cache tant que les données de l'utilisateur n'ont pas changé.
+    If-None-Match avec l'ETag courant : 304 sans recalcul. compute est une coroutine.
+    """
+    key = (current_user.id, request.url.path, tuple(sorted(request.query_params.multi_items())))
+    generation = current_user.data_generation
+    
+    entry = response_cache.get(key, generation)
+    if entry is None:
+        content = response_adapter(response_model).validate_python(await compute(), from_attributes=True)
+        body = JSONResponse(content=jsonable_encoder(content)).body
+        entry = response_cache.put(key, generation, body)
+    
+    headers = {"ETag": entry.etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        response_cache.record_not_modified()
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
         
+def encode_history_cursor(match: Match) -> str:
+    raw = json.dumps([match.played_at.isoformat(), match.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
 
-@router.get("/history", response_model=List[MatchOut])
-def get_history(
-    db: Session = Depends(get_db), 
-    current_user = Depends(get_current_user),
-    limit: int = 10,
-    offset: int = 0
+def decode_history_cursor(cursor: str) -> tuple:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        played_at, match_pk = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(played_at), int(match_pk)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Curseur invalide")
+        
+@router.get("/history", response_model=MatchHistoryPage)
+async def get_history(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db), 
+    current_user: Principal = Depends(get_current_user),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None
     ):
-    matches = (
-        db.query(Match)
-        .filter(Match.user_id == current_user.id)
-        .order_by(Match.played_at.desc())
-        .offset(offset)
-        .limit(limit)
-        .all()
-    )
-    if not matches:
-        raise HTTPException(status_code=404, detail="Aucun match trouvé.")
+    async def compute():
+        query = select(Match).filter(Match.user_id == current_user.id)
+        if cursor:
+            played_at, match_pk = decode_history_cursor(cursor)
+            # Keyset : la page N coûte autant que la page 1 et ne glisse pas à l'arrivée de nouveaux matchs
+            query = query.filter(tuple_(Match.played_at, Match.id) < tuple_(played_at, match_pk))
+        
+        result = await db.execute(
+            query
+            .order_by(Match.played_at.desc(), Match.id.desc())
+            .limit(limit + 1)
+        )
+        matches = result.scalars().all()
+        # Décodage des plateaux sans accès bloquant à la base
+        await db.run_sync(catalog.load_missing, [match.board for match in matches])
+        if not matches and not cursor:
+            raise HTTPException(status_code=404, detail="Aucun match trouvé.")
+        
+        next_cursor = None
+        if len(matches) > limit:
+            matches = matches[:limit]
+            next_cursor = encode_history_cursor(matches[-1])
+        
+        return {"items": matches, "next_cursor": next_cursor}
     
-    return matches
+    return await cached_response(request, current_user, MatchHistoryPage, compute)
                
         
 @router.get("/stats", response_model=List[CompositionStats])
-def get_composition_stats(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    matches = (
-        db.query(Match)
-        .filter(Match.user_id == current_user.id)
-        .all()
-    )
-
-    return compute_stats_by_traits(matches)
+async def get_composition_stats(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+    filters: StatsFilters = Depends()
+):
+    async def compute():
+        return format_composition_stats(await db.run_sync(fetch_stats, current_user.id, "composition", filters))
+    
+    return await cached_response(request, current_user, List[CompositionStats], compute)
 
 
 @router.get("/top-units", response_model=List[UnitStats])
-def get_top_units(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def get_top_units(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+    filters: StatsFilters = Depends()
 ):
-    matches = db.query(Match).filter(Match.user_id == current_user.id).all()
-    
-    if not matches:
-        raise HTTPException(status_code=404, detail="Aucun match trouvé pour l'utilisateur")
-    
-    unit_counter = Counter()
-    win_counter = Counter()
-    
-    for match in matches:
-        placement = match.placement
-        for unit in match.units:
-            cid = unit["character_id"]
-            unit_counter[cid] += 1
-            if placement <= 4:
-                win_counter[cid] += 1
-            
-    top_units = unit_counter.most_common(5)
+    async def compute():
+        top_units = await db.run_sync(fetch_stats, current_user.id, "unit", filters, limit=5)
+        
+        if not top_units:
+            raise HTTPException(status_code=404, detail="Aucun match trouvé pour l'utilisateur")
+        
+        return format_unit_stats(top_units)
     
-    return [
-        {
-            "character_id": cid,
-            "count": count,
-            "winrate": round((win_counter[cid] / count) * 100, 2) if count > 0 else 0.0
-        }
-        for cid, count in top_units
-    ]
+    return await cached_response(request, current_user, List[UnitStats], compute)
 
 
 @router.get("/top-traits", response_model=List[TraitStats])
-def get_top_traits(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def get_top_traits(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+    filters: StatsFilters = Depends()
 ):
-    matches = db.query(Match).filter(Match.user_id == current_user.id).all()
-    
-    if not matches:
-        raise HTTPException(status_code=404, detail="Aucun match trouvé pour l'utilisateur")
-    
-    trait_counter = Counter()
-    win_counter = Counter()
+    async def compute():
+        top_traits = await db.run_sync(fetch_stats, current_user.id, "trait", filters, limit=5)
+        
+        if not top_traits:
+            raise HTTPException(status_code=404, detail="Aucun match trouvé pour l'utilisateur")
+        
+        return format_trait_stats(top_traits)
     
-    for match in matches:
-        placement = match.placement
-        for trait in match.traits:
-            tn = trait["name"]
-            trait_counter[tn] += 1
-            if placement <= 4:
-                win_counter[tn] += 1
-            
-    top_traits = trait_counter.most_common(5)
+    return await cached_response(request, current_user, List[TraitStats], compute)
+
+
+@router.get("/unit-items", response_model=List[UnitItemStats])
+async def get_unit_items(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+    filters: StatsFilters = Depends(),
+    character_id: Optional[str] = None,
+    top: int = Query(3, ge=1, le=10)
+):
+    async def compute():
+        # Items par unité : calcul vectorisé sur l'historique chargé en colonnes
+        columns = await db.run_sync(load_user_columns, current_user.id, filters)
+        if not len(columns):
+            raise HTTPException(status_code=404, detail="Aucun match trouvé pour l'utilisateur")
+        
+        return unit_item_stats(columns, character_id, top)
     
-    return [
-        {
-            "name": tn.replace("TFT13_", "").lower(),
-            "count": count,
-            "winrate": round((win_counter[tn] / count) * 100, 2) if count > 0 else 0.0
-        }
-        for tn, count in top_traits
-    ]
\ No newline at end of file
+    return await cached_response(request, current_user, List[UnitItemStats], compute)
+
+
+@router.get("/dashboard", response_model=DashboardStats)
+async def get_dashboard(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+    filters: StatsFilters = Depends()
+):
+    # Remplace les 3 appels /stats, /top-units et /top-traits du dashboard
+    return await cached_response(
+        request, current_user, DashboardStats,
+        lambda: db.run_sync(fetch_dashboard, current_user.id, filters)
+    )
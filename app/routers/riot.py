@@ -1,123 +1,186 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.user import RiotAccount
-from app.services.riot_service import get_puuid_from_riot, get_recent_match_ids, get_match_details, extract_player_data, store_match_if_not_exists, get_summoner_info
-from app.core.database import SessionLocal
-from app.core.security import get_current_user
+from app.services.riot_service import get_puuid_from_riot, get_recent_match_ids, get_match_details, extract_player_data, match_to_player_data, get_summoner_info, get_summoners_info
+from app.services.sync_service import sync_worker
+from app.services.backfill_service import backfill_runner
+from app.services.catalog import catalog
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.core.security import Principal, get_current_user, principal_cache
 from app.models.user import User
-from app.schemas.riot import RiotLinkResponse, PlayerMatchData, RiotSummonerInfo
+from app.models.match import Match
+from app.models.sync_state import SyncState
+from app.models.backfill_job import BackfillJob
+from app.schemas.riot import RiotLinkResponse, PlayerMatchData, RiotSummonerInfo, SummonerBatchRequest, SummonerBatchResponse
+from app.schemas.sync import SyncStatus
+from app.schemas.backfill import BackfillStatus
 
 router = APIRouter(prefix="/riot", tags=["riot"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-        
+# Les appels Riot (requests, bloquants) passent par le pool de threads de Starlette,
+# les services écrits pour une Session synchrone par db.run_sync.
+
 @router.put("/link-riot", response_model=RiotLinkResponse)
-def link_riot_account(
+async def link_riot_account(
     data: RiotAccount, 
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    puuid = get_puuid_from_riot(data.game_name, data.tag_line, data.region)
+    puuid = await run_in_threadpool(get_puuid_from_riot, data.game_name, data.tag_line, data.region)
     
-    existing_user = db.query(User).filter(User.puuid == puuid, User.id != current_user.id).first()
-    if existing_user:
+    result = await db.execute(select(User).filter(User.puuid == puuid, User.id != current_user.id))
+    if result.scalars().first():
         raise HTTPException(
             status_code=400,
             detail="Ce compte Riot est déjà lié à un autre utilisateur"
         )
     
-    current_user.game_name = data.game_name.lower()
-    current_user.tag_line = data.tag_line.lower()
-    current_user.puuid = puuid
-    current_user.region = data.region.lower()
+    user = await db.get(User, current_user.id)
+    user.game_name = data.game_name.lower()
+    user.tag_line = data.tag_line.lower()
+    user.puuid = puuid
+    user.region = data.region.lower()
+    await db.commit()
+    principal_cache.invalidate(user.id)
     
-    user = db.merge(current_user)
-    db.commit()
-    db.refresh(user)
+    # Nouveau compte : synchronisé tout de suite, sans attendre l'intervalle
+    sync_worker.request_sync(user.id, force=True)
+    await db.run_sync(backfill_runner.start_backfill, user)
     
     return {
         "message": "Compte Riot lié avec succès!",
-        "game_name": current_user.game_name,
-        "tag_line": current_user.tag_line,
-        "puuid": current_user.puuid
+        "game_name": user.game_name,
+        "tag_line": user.tag_line,
+        "puuid": user.puuid
     }
     
 @router.delete("/unlink-riot")
-def unlink_riot_account(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def unlink_riot_account(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    current_user.game_name = None,
-    current_user.tag_line = None,
-    current_user.puuid = None,
-    current_user.region = None  
+    user = await db.get(User, current_user.id)
+    user.game_name = None
+    user.tag_line = None
+    user.puuid = None
+    user.region = None  
+    # Le backfill en cours ne doit plus consommer de quota pour ce compte
+    await db.run_sync(backfill_runner.cancel, user.id)
     
-    db.merge(current_user)
-    db.commit()
+    await db.commit()
+    principal_cache.invalidate(user.id)
     
     return {"message": "Compte Riot délié avec succès."}
     
 @router.get("/matches")
-def get_user_matchs_ids(
-    current_user: User = Depends(get_current_user)
+async def get_user_matchs_ids(
+    current_user: Principal = Depends(get_current_user)
 ):
     if not current_user.puuid or not current_user.region:
         raise HTTPException(
             status_code=400, detail="Compte Riot non lié"
         )
     
-    match_ids =  get_recent_match_ids(current_user.puuid, current_user.region)
+    match_ids = await run_in_threadpool(get_recent_match_ids, current_user.puuid, current_user.region)
     return {
         "message": "Matchs récupérés avec succès",
         "match_ids": match_ids
     }
     
 @router.get("/match/{match_id}", response_model=PlayerMatchData)
-def get_match_info(match_id: str, current_user: User = Depends(get_current_user)):
+async def get_match_info(match_id: str, current_user: Principal = Depends(get_current_user)):
     if not current_user.puuid or not current_user.region:
         raise HTTPException(status_code=400, detail="Compte Riot non lié ou région non définie")
     
-    match_details = get_match_details(match_id, current_user.region)
+    match_details = await run_in_threadpool(get_match_details, match_id, current_user.region)
     player_data = extract_player_data(match_details, current_user.puuid)
     return player_data
 
 
 @router.get("/history", response_model=list[PlayerMatchData])
-def get_match_history(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def get_match_history(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+    limit: int = 10
 ):
     if not current_user.puuid or not current_user.region:
         raise HTTPException(status_code=400, detail="Compte Riot non liée ou région non définie")
     
-    match_ids = get_recent_match_ids(current_user.puuid, current_user.region)
+    # Lecture uniquement en base : l'ingestion est faite par le worker de synchronisation
+    sync_worker.request_sync(current_user.id)
+    
+    result = await db.execute(
+        select(Match)
+        .filter(Match.user_id == current_user.id)
+        .order_by(Match.played_at.desc())
+        .limit(limit)
+    )
+    matches = result.scalars().all()
+    # Décodage des plateaux sans accès bloquant à la base
+    await db.run_sync(catalog.load_missing, [match.board for match in matches])
+    return [match_to_player_data(match) for match in matches]
+
+@router.get("/sync", response_model=SyncStatus)
+async def get_sync_status(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    state = await db.get(SyncState, current_user.id)
+    pending = sync_worker.is_pending(current_user.id)
+    if state is None:
+        return {"pending": pending}
     
-    results = []
+    return {
+        "last_played_at": state.last_played_at,
+        "last_sync_at": state.last_sync_at,
+        "last_status": state.last_status,
+        "last_error": state.last_error,
+        "matches_synced": state.matches_synced,
+        "pending": pending
+    }
+
+@router.post("/backfill", response_model=BackfillStatus)
+async def start_history_backfill(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    if not current_user.puuid or not current_user.region:
+        raise HTTPException(status_code=400, detail="Compte Riot non lié ou région non définie")
     
-    for match_id in match_ids:
-        try:
-            match_data = get_match_details(match_id, current_user.region)
-            store_match_if_not_exists(db, match_data, current_user.puuid, current_user.id)
-            player_data = extract_player_data(match_data, current_user.puuid)
-            results.append(player_data)
-        except Exception as e:
-            print(f"Erreur lors du traitement du match {match_id} : {e}")
-            continue
+    return await db.run_sync(backfill_runner.start_backfill, current_user)
+
+@router.get("/backfill", response_model=BackfillStatus)
+async def get_history_backfill(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    result = await db.execute(select(BackfillJob).filter(BackfillJob.user_id == current_user.id))
+    job = result.scalars().first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Aucun backfill pour cet utilisateur")
     
-    return results
+    return job
+
+@router.post("/summoners:batch", response_model=SummonerBatchResponse)
+async def get_riot_summoners_info(data: SummonerBatchRequest, current_user: Principal = Depends(get_current_user)):
+    if not data.accounts:
+        raise HTTPException(status_code=400, detail="Aucun compte Riot demandé.")
+    if len(data.accounts) > settings.RIOT_SUMMONER_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"{settings.RIOT_SUMMONER_BATCH_MAX} comptes Riot maximum par requête.")
+    
+    accounts = [(account.game_name, account.tag_line, account.region) for account in data.accounts]
+    return {"results": await run_in_threadpool(get_summoners_info, accounts)}
 
 @router.get("/{game_name}/{tag_line}/{region}", response_model=RiotSummonerInfo)
-def get_riot_summoner_info(game_name: str, tag_line: str, region: str, db: Session = Depends(get_db)):
-    return get_summoner_info(game_name.lower(), tag_line.lower(), region.lower())
+async def get_riot_summoner_info(game_name: str, tag_line: str, region: str):
+    return await run_in_threadpool(get_summoner_info, game_name.lower(), tag_line.lower(), region.lower())
 
 @router.get("/me", response_model=RiotSummonerInfo)
-def get_my_riot_summoner_info(current_user: User = Depends(get_current_user)):
+async def get_my_riot_summoner_info(current_user: Principal = Depends(get_current_user)):
     if not current_user.game_name or not current_user.tag_line or not current_user.region:
         raise HTTPException(status_code=400, detail="Compte Riot non lié.")
     
-    return get_summoner_info(current_user.game_name, current_user.tag_line, current_user.region)
\ No newline at end of file
+    return await run_in_threadpool(get_summoner_info, current_user.game_name, current_user.tag_line, current_user.region)
\ No newline at end of file
@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+class BackfillStatus(BaseModel):
+    status: str
+    next_start: int
+    matches_seen: int
+    matches_inserted: int
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    
+    class Config: {
+        "from_attributes": True
+    }
\ No newline at end of file
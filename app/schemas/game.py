@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from typing import List
     
 class CompositionStats(BaseModel):
     composition: str
@@ -19,4 +20,15 @@ class UnitStats(BaseModel):
 class TraitStats(BaseModel):
     name: str
     count: int
-    winrate: float
\ No newline at end of file
+    winrate: float
+    
+class UnitItemStats(BaseModel):
+    character_id: str
+    item: str
+    count: int
+    winrate: float
+    
+class DashboardStats(BaseModel):
+    compositions: List[CompositionStats]
+    top_units: List[UnitStats]
+    top_traits: List[TraitStats]
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 
 class TraitOut(BaseModel):
@@ -25,4 +25,8 @@ class MatchOut(BaseModel):
     class Config: {
         "from_attributes": True
     }
-    
\ No newline at end of file
+        
+class MatchHistoryPage(BaseModel):
+    items: List[MatchOut]
+    # Curseur opaque à renvoyer pour obtenir la page suivante (None en fin d'historique)
+    next_cursor: Optional[str] = None
\ No newline at end of file
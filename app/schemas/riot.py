@@ -1,5 +1,6 @@
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
+from app.schemas.user import RiotAccount
     
 # USERS
 class RiotLinkResponse(BaseModel):
@@ -38,4 +39,22 @@ class RiotSummonerInfo(BaseModel):
     league_points: int
     wins: int
     losses: int
-    hot_streak: int
\ No newline at end of file
+    hot_streak: int
+
+class SummonerBatchRequest(BaseModel):
+    accounts: List[RiotAccount]
+
+class SummonerBatchError(BaseModel):
+    status_code: int
+    detail: str
+
+class SummonerBatchItem(BaseModel):
+    game_name: str
+    tag_line: str
+    region: str
+    # Un seul des deux est renseigné
+    summoner: Optional[RiotSummonerInfo] = None
+    error: Optional[SummonerBatchError] = None
+
+class SummonerBatchResponse(BaseModel):
+    results: List[SummonerBatchItem]
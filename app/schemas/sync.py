@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+class SyncStatus(BaseModel):
+    last_played_at: Optional[datetime] = None
+    last_sync_at: Optional[datetime] = None
+    last_status: Optional[str] = None
+    last_error: Optional[str] = None
+    matches_synced: int = 0
+    pending: bool = False
\ No newline at end of file
@@ -0,0 +1,162 @@
+import sys
+from collections import defaultdict
+from typing import Iterable, List
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal, dialect_insert
+from app.models.match import Match
+from app.models.user import User
+from app.models.user_stat import UserStat
+from app.models.user_daily_stat import UserDailyStat
+from app.services.composition import classify_traits
+from app.services.catalog import match_board
+
+AGGREGATE_KINDS = ("composition", "unit", "trait")
+
+
+def aggregate_rows(rows: Iterable[dict]) -> dict:
+    """
+    Agrège des lignes de matchs en compteurs {(user_id, day, kind, key): [games, top4, placement_sum]}.
+    """
+    totals = defaultdict(lambda: [0, 0, 0])
+
+    def add(user_id, day, kind, key, placement):
+        counters = totals[(user_id, day, kind, key)]
+        counters[0] += 1
+        counters[1] += 1 if placement <= 4 else 0
+        counters[2] += placement
+
+    for row in rows:
+        user_id = row["user_id"]
+        placement = row["placement"]
+        day = row["played_at"].date()
+
+        composition = classify_traits(row["traits"]).stats_key
+        if composition is not None:
+            add(user_id, day, "composition", composition, placement)
+        for unit in row["units"] or []:
+            add(user_id, day, "unit", unit["character_id"], placement)
+        for trait in row["traits"] or []:
+            add(user_id, day, "trait", trait["name"], placement)
+
+    return totals
+
+
+def _upsert_counters(db: Session, model, index_elements: List[str], values: List[dict]):
+    stmt = dialect_insert(db, model).values(values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={
+            "games": model.games + stmt.excluded.games,
+            "top4": model.top4 + stmt.excluded.top4,
+            "placement_sum": model.placement_sum + stmt.excluded.placement_sum
+        }
+    )
+    db.execute(stmt)
+
+
+def apply_aggregates(db: Session, rows: List[dict]):
+    """
+    Incrémente user_stats et user_daily_stats pour des matchs nouvellement insérés (sans commit).
+    """
+    daily_totals = aggregate_rows(rows)
+    if not daily_totals:
+        return
+
+    totals = defaultdict(lambda: [0, 0, 0])
+    for (user_id, day, kind, key), counters in daily_totals.items():
+        merged = totals[(user_id, kind, key)]
+        for i, value in enumerate(counters):
+            merged[i] += value
+
+    _upsert_counters(db, UserStat, ["user_id", "kind", "key"], [
+        {
+            "user_id": user_id,
+            "kind": kind,
+            "key": key,
+            "games": games,
+            "top4": top4,
+            "placement_sum": placement_sum
+        }
+        for (user_id, kind, key), (games, top4, placement_sum) in totals.items()
+    ])
+    _upsert_counters(db, UserDailyStat, ["user_id", "kind", "day", "key"], [
+        {
+            "user_id": user_id,
+            "day": day,
+            "kind": kind,
+            "key": key,
+            "games": games,
+            "top4": top4,
+            "placement_sum": placement_sum
+        }
+        for (user_id, day, kind, key), (games, top4, placement_sum) in daily_totals.items()
+    ])
+
+
+def bump_data_generation(db: Session, user_ids=None):
+    """
+    Invalide les réponses en cache des utilisateurs (tous si user_ids est None), sans commit.
+    """
+    query = db.query(User)
+    if user_ids is not None:
+        if not user_ids:
+            return
+        query = query.filter(User.id.in_(user_ids))
+    query.update({User.data_generation: User.data_generation + 1}, synchronize_session=False)
+
+
+def rebuild_user_aggregates(db: Session, user_id: int = None) -> int:
+    """
+    Recalcule user_stats et user_daily_stats depuis `matches` (réparation de cohérence).
+    Sans user_id, tous les utilisateurs sont reconstruits. Retourne le nombre de matchs relus.
+    """
+    stats_queries = [db.query(UserStat), db.query(UserDailyStat)]
+    matches_query = (
+        db.query(Match.user_id, Match.placement, Match.played_at, Match.board, Match.legacy_traits, Match.legacy_units)
+        .filter(Match.user_id.isnot(None), Match.played_at.isnot(None))
+    )
+    if user_id is not None:
+        stats_queries = [query.filter_by(user_id=user_id) for query in stats_queries]
+        matches_query = matches_query.filter(Match.user_id == user_id)
+
+    for query in stats_queries:
+        query.delete(synchronize_session=False)
+
+    count = 0
+    batch = []
+    for row in matches_query.yield_per(1000):
+        traits, units = match_board(row.board, row.legacy_traits, row.legacy_units)
+        batch.append({
+            "user_id": row.user_id,
+            "placement": row.placement,
+            "played_at": row.played_at,
+            "traits": traits,
+            "units": units
+        })
+        if len(batch) >= 1000:
+            apply_aggregates(db, batch)
+            count += len(batch)
+            batch = []
+    apply_aggregates(db, batch)
+    count += len(batch)
+
+    db.commit()
+    return count
+
+
+if __name__ == "__main__":
+    # python -m app.services.aggregate_service rebuild [user_id]
+    if len(sys.argv) < 2 or sys.argv[1] != "rebuild":
+        print("Usage : python -m app.services.aggregate_service rebuild [user_id]")
+        sys.exit(1)
+
+    from app.models import user, role
+
+    db = SessionLocal()
+    try:
+        target = int(sys.argv[2]) if len(sys.argv) > 2 else None
+        print(f"{rebuild_user_aggregates(db, target)} matchs agrégés")
+        bump_data_generation(db, None if target is None else [target])
+        db.commit()
+    finally:
+        db.close()
@@ -1,19 +1,19 @@
-from sqlalchemy.orm import Session
-from passlib.context import CryptContext
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from fastapi import HTTPException, status
 from app.core.config import settings
 from app.models.user import User
 from app.schemas.user import UserCreate
+from app.services.password_hasher import password_hasher
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+async def get_password_hash(password: str) -> str:
+    return await password_hasher.hash(password)
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
-
-def create_user(user_data: UserCreate, db: Session) -> User:
-    hashed_password = get_password_hash(user_data.password)
+async def create_user(user_data: UserCreate, db: AsyncSession) -> dict:
+    hashed_password = await get_password_hash(user_data.password)
     db_user = User(
         email=user_data.email,
         username=user_data.username,
@@ -21,8 +21,8 @@ def create_user(user_data: UserCreate, db: Session) -> User:
         role_id=2
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user, ["role"])
     return {
         "id": db_user.id,
         "username": db_user.username,
@@ -30,19 +30,27 @@ def create_user(user_data: UserCreate, db: Session) -> User:
         "role": db_user.role.name
     }
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.verify(plain_password, hashed_password)
 
-def authenticate_user(identifier: str, password: str, db: Session) -> bool:
-    user = db.query(User).filter(
-        (User.email == identifier) | (User.username == identifier)
-    ).first()
+async def authenticate_user(identifier: str, password: str, db: AsyncSession) -> User:
+    result = await db.execute(
+        select(User)
+        .options(selectinload(User.role))
+        .filter((User.email == identifier) | (User.username == identifier))
+    )
+    user = result.scalars().first()
     
-    if not user or not verify_password(password, user.hashed_password):
+    if not user or not await verify_password(password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Identifiants invalides"
         )
+    
+    # Coût bcrypt modifié depuis le hash : on profite du mot de passe en clair pour le refaire
+    if password_hasher.needs_rehash(user.hashed_password):
+        user.hashed_password = await get_password_hash(password)
+        await db.commit()
         
     return user
 
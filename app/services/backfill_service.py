@@ -0,0 +1,183 @@
+import logging
+from datetime import datetime, timedelta
+from threading import Lock, Timer
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.user import User
+from app.models.backfill_job import BackfillJob
+from app.services.riot_service import get_recent_match_ids, ingest_match_ids
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("pending", "running")
+
+
+def claim_job(db: Session, job_id: int, puuid: str) -> bool:
+    """
+    Passe le job en "running" s'il n'est détenu par personne : en attente, ou en cours
+    sans progression depuis BACKFILL_LEASE_SECONDS (process arrêté). UPDATE conditionnel :
+    un seul process gagne, même si plusieurs reprennent les jobs au démarrage.
+    """
+    now = datetime.utcnow()
+    stale = now - timedelta(seconds=settings.BACKFILL_LEASE_SECONDS)
+    claimed = (
+        db.query(BackfillJob)
+        .filter(
+            BackfillJob.id == job_id,
+            BackfillJob.puuid == puuid,
+            or_(
+                BackfillJob.status == "pending",
+                and_(BackfillJob.status == "running", BackfillJob.updated_at < stale)
+            )
+        )
+        .update({BackfillJob.status: "running", BackfillJob.error: None, BackfillJob.updated_at: now}, synchronize_session=False)
+    )
+    db.commit()
+    return claimed == 1
+
+
+def run_backfill(db: Session, job: BackfillJob):
+    """
+    Parcourt tout l'historique d'ids de matchs par pages start/count (job déjà réclamé).
+    La progression est committée après chaque page : un redémarrage reprend à next_start.
+    Chaque écriture exige que le job soit toujours "running" pour le même puuid : un job
+    annulé (compte délié) ou relancé pour un autre compte s'arrête sans écraser la ligne.
+    Les appels Riot passent par le limiteur de débit partagé.
+    """
+    job_id, puuid, region = job.id, job.puuid, job.region
+    owned = db.query(BackfillJob).filter(
+        BackfillJob.id == job_id,
+        BackfillJob.puuid == puuid,
+        BackfillJob.status == "running"
+    )
+
+    try:
+        while True:
+            job = owned.first()
+            if job is None:
+                return
+
+            match_ids = get_recent_match_ids(puuid, region, count=settings.BACKFILL_PAGE_SIZE, start=job.next_start)
+            inserted = ingest_match_ids(db, puuid, region, match_ids)["inserted"] if match_ids else 0
+            done = len(match_ids) < settings.BACKFILL_PAGE_SIZE
+
+            updated = owned.update({
+                BackfillJob.next_start: BackfillJob.next_start + len(match_ids),
+                BackfillJob.matches_seen: BackfillJob.matches_seen + len(match_ids),
+                BackfillJob.matches_inserted: BackfillJob.matches_inserted + inserted,
+                BackfillJob.status: "done" if done else "running",
+                BackfillJob.updated_at: datetime.utcnow()
+            }, synchronize_session=False)
+            db.commit()
+
+            if not updated or done:
+                return
+    except Exception as e:
+        db.rollback()
+        owned.update({BackfillJob.status: "error", BackfillJob.error: str(e)[:500]}, synchronize_session=False)
+        db.commit()
+
+
+class BackfillRunner:
+    """
+    Exécute les jobs de backfill en arrière-plan, un job actif par utilisateur.
+    Un job n'est exécuté qu'après l'avoir réclamé en base (claim_job).
+    """
+
+    def __init__(self, workers: int):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="backfill")
+        # (job_id, puuid) : un job relancé pour un autre compte n'attend pas la fin de l'ancien
+        self._active = set()
+        self._lock = Lock()
+
+    def start_backfill(self, db: Session, user: User) -> BackfillJob:
+        job = db.query(BackfillJob).filter(BackfillJob.user_id == user.id).first()
+
+        if job is not None and job.puuid == user.puuid:
+            lease = datetime.utcnow() - timedelta(seconds=settings.BACKFILL_LEASE_SECONDS)
+            if job.status == "running" and job.updated_at >= lease:
+                # Déjà en cours (dans ce process ou un autre)
+                return job
+            if job.status == "pending":
+                self.submit(job.id, job.puuid)
+                return job
+
+        if job is None:
+            job = BackfillJob(user_id=user.id, puuid=user.puuid, region=user.region)
+            db.add(job)
+        elif job.puuid != user.puuid or job.status == "done":
+            # Nouveau compte lié ou relance complète : on repart du début
+            job.puuid = user.puuid
+            job.region = user.region
+            job.next_start = 0
+            job.matches_seen = 0
+            job.matches_inserted = 0
+        job.status = "pending"
+        job.error = None
+        db.commit()
+        db.refresh(job)
+
+        self.submit(job.id, job.puuid)
+        return job
+
+    def cancel(self, db: Session, user_id: int):
+        """
+        Annule le backfill en cours d'un utilisateur (compte délié), sans commit :
+        le job s'arrête à sa prochaine écriture de progression.
+        """
+        (
+            db.query(BackfillJob)
+            .filter(BackfillJob.user_id == user_id, BackfillJob.status.in_(ACTIVE_STATUSES))
+            .update({BackfillJob.status: "cancelled"}, synchronize_session=False)
+        )
+
+    def submit(self, job_id: int, puuid: str):
+        with self._lock:
+            if (job_id, puuid) in self._active:
+                return
+            self._active.add((job_id, puuid))
+        self._executor.submit(self._run, job_id, puuid)
+
+    def resume_pending(self):
+        """
+        Relance les jobs interrompus (arrêt ou crash) depuis leur dernier checkpoint.
+        Un job encore "running" est retenté une fois son bail expiré : celui d'un process
+        arrêté est alors repris, celui d'un process vivant reste à son propriétaire.
+        """
+        db = SessionLocal()
+        try:
+            jobs = (
+                db.query(BackfillJob.id, BackfillJob.puuid, BackfillJob.status)
+                .filter(BackfillJob.status.in_(ACTIVE_STATUSES))
+                .all()
+            )
+        finally:
+            db.close()
+
+        for job_id, puuid, status in jobs:
+            self.submit(job_id, puuid)
+            if status == "running":
+                retry = Timer(settings.BACKFILL_LEASE_SECONDS, self.submit, (job_id, puuid))
+                retry.daemon = True
+                retry.start()
+
+    def stop(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job_id: int, puuid: str):
+        db = SessionLocal()
+        try:
+            if claim_job(db, job_id, puuid):
+                run_backfill(db, db.get(BackfillJob, job_id))
+        except Exception:
+            logger.exception("Erreur lors du backfill %s", job_id)
+        finally:
+            db.close()
+            with self._lock:
+                self._active.discard((job_id, puuid))
+
+
+backfill_runner = BackfillRunner(workers=settings.BACKFILL_WORKERS)
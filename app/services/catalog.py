@@ -0,0 +1,196 @@
+import struct
+from threading import Lock
+from typing import Dict, Iterable, List, Tuple
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal, engine, dialect_insert
+from app.models.catalog_entry import CatalogEntry
+
+# Format de Match.board (little-endian) :
+#   en-tête   : version u8, nb_traits u8, nb_unités u8
+#   trait     : id u16, tier_current u8, num_units u8
+#   unité     : id u16, tier u8, nb_items u8, puis nb_items x id d'item u16
+BOARD_VERSION = 1
+HEADER = struct.Struct("<BBB")
+TRAIT = struct.Struct("<HBB")
+UNIT = struct.Struct("<HBB")
+ITEM = struct.Struct("<H")
+# Les ids sont encodés sur u16
+MAX_ENTRY_ID = 0xFFFF
+
+
+def board_ids(board: bytes) -> Iterable[int]:
+    """
+    Ids du catalogue référencés par un plateau encodé (sans résoudre les noms).
+    """
+    _, n_traits, n_units = HEADER.unpack_from(board, 0)
+    offset = HEADER.size
+    for _ in range(n_traits):
+        yield TRAIT.unpack_from(board, offset)[0]
+        offset += TRAIT.size
+    for _ in range(n_units):
+        unit_id, _, n_items = UNIT.unpack_from(board, offset)
+        offset += UNIT.size
+        yield unit_id
+        for (item_id,) in ITEM.iter_unpack(board[offset:offset + n_items * ITEM.size]):
+            yield item_id
+        offset += n_items * ITEM.size
+
+
+class Catalog:
+    """
+    Cache process des entrées du catalogue, dans les deux sens.
+    Les nouveaux noms sont enregistrés dans leur propre transaction (committée
+    immédiatement) pour qu'un id mis en cache existe toujours en base.
+    """
+
+    def __init__(self):
+        self._ids: Dict[Tuple[str, str], int] = {}
+        self._names: Dict[int, str] = {}
+        self._lock = Lock()
+
+    def _remember(self, entries: Iterable[tuple]):
+        with self._lock:
+            for entry_id, kind, name in entries:
+                self._ids[(kind, name)] = entry_id
+                self._names[entry_id] = name
+
+    def load(self, db: Session = None):
+        """
+        Charge tout le catalogue (au démarrage : les noms connus ne sont plus réinsérés).
+        """
+        if db is None:
+            db = SessionLocal()
+            try:
+                self.load(db)
+            finally:
+                db.close()
+            return
+        self._remember(db.query(CatalogEntry.id, CatalogEntry.kind, CatalogEntry.name))
+
+    def load_missing(self, db: Session, boards: Iterable[bytes]):
+        """
+        Charge en une requête les entrées inconnues référencées par des plateaux.
+        Appelé via AsyncSession.run_sync par les routes, pour que le décodage
+        ne fasse jamais d'accès bloquant à la base depuis la boucle d'événements.
+        """
+        missing = {entry_id for board in boards if board is not None for entry_id in board_ids(board)}
+        missing.difference_update(self._names)
+        if missing:
+            self._remember(
+                db.query(CatalogEntry.id, CatalogEntry.kind, CatalogEntry.name)
+                .filter(CatalogEntry.id.in_(missing))
+            )
+
+    def ids_for(self, keys: Iterable[Tuple[str, str]], bind=None) -> Dict[Tuple[str, str], int]:
+        """
+        Ids des (kind, name) demandés, créés au besoin.
+        bind : moteur de la base cible (par défaut celui de l'application), ou connexion
+        d'une migration : l'enregistrement se fait alors dans sa transaction.
+        """
+        keys = set(keys)
+        missing = [key for key in keys if key not in self._ids]
+
+        if missing:
+            db = Session(bind=bind if bind is not None else engine)
+            try:
+                entries = self._register(db, missing)
+                db.commit()
+            finally:
+                db.close()
+            too_large = [name for entry_id, _, name in entries if entry_id > MAX_ENTRY_ID]
+            if too_large:
+                raise ValueError(f"Catalogue plein : id supérieur à {MAX_ENTRY_ID} pour {too_large[:5]}")
+            self._remember(entries)
+
+        return {key: self._ids[key] for key in keys}
+
+    def _register(self, db: Session, missing: List[Tuple[str, str]]) -> List[tuple]:
+        # SELECT d'abord : un INSERT ... ON CONFLICT en conflit consomme quand même
+        # une valeur de séquence sous PostgreSQL, les ids grimperaient à chaque process
+        names = {name for _, name in missing}
+        query = (
+            db.query(CatalogEntry.id, CatalogEntry.kind, CatalogEntry.name)
+            .filter(CatalogEntry.name.in_(names))
+        )
+        entries = query.all()
+        known = {(kind, name) for _, kind, name in entries}
+        new = [key for key in missing if key not in known]
+        if not new:
+            return entries
+
+        # ON CONFLICT reste utile si un autre process enregistre le même nom en parallèle
+        stmt = dialect_insert(db, CatalogEntry).values(
+            [{"kind": kind, "name": name} for kind, name in new]
+        ).on_conflict_do_nothing(index_elements=["kind", "name"])
+        db.execute(stmt)
+        return query.all()
+
+    def name(self, entry_id: int) -> str:
+        name = self._names.get(entry_id)
+        if name is None:
+            # Entrée créée par un autre process : on recharge le catalogue
+            self.load()
+            name = self._names[entry_id]
+        return name
+
+    def encode_boards(self, boards: List[Tuple[List[dict], List[dict]]], bind=None) -> List[bytes]:
+        """
+        Encode des plateaux (traits, unités) en un seul aller-retour catalogue.
+        """
+        keys = set()
+        for traits, units in boards:
+            traits, units = traits or [], units or []
+            keys.update(("trait", trait["name"]) for trait in traits)
+            for unit in units:
+                keys.add(("unit", unit["character_id"]))
+                keys.update(("item", item) for item in unit.get("items", []))
+        ids = self.ids_for(keys, bind)
+
+        encoded = []
+        for traits, units in boards:
+            traits, units = traits or [], units or []
+            parts = [HEADER.pack(BOARD_VERSION, len(traits), len(units))]
+            for trait in traits:
+                parts.append(TRAIT.pack(
+                    ids[("trait", trait["name"])], trait.get("tier_current", 0), trait.get("num_units", 0)
+                ))
+            for unit in units:
+                items = unit.get("items", [])
+                parts.append(UNIT.pack(ids[("unit", unit["character_id"])], unit.get("tier", 0), len(items)))
+                parts.extend(ITEM.pack(ids[("item", item)]) for item in items)
+            encoded.append(b"".join(parts))
+        return encoded
+
+    def decode_board(self, board: bytes) -> Tuple[List[dict], List[dict]]:
+        version, n_traits, n_units = HEADER.unpack_from(board, 0)
+        if version != BOARD_VERSION:
+            raise ValueError(f"Version de plateau inconnue : {version}")
+        offset = HEADER.size
+
+        traits = []
+        for _ in range(n_traits):
+            trait_id, tier_current, num_units = TRAIT.unpack_from(board, offset)
+            offset += TRAIT.size
+            traits.append({"name": self.name(trait_id), "tier_current": tier_current, "num_units": num_units})
+
+        units = []
+        for _ in range(n_units):
+            unit_id, tier, n_items = UNIT.unpack_from(board, offset)
+            offset += UNIT.size
+            items = [self.name(item_id) for (item_id,) in ITEM.iter_unpack(board[offset:offset + n_items * ITEM.size])]
+            offset += n_items * ITEM.size
+            units.append({"character_id": self.name(unit_id), "tier": tier, "items": items})
+
+        return traits, units
+
+
+catalog = Catalog()
+
+
+def match_board(board: bytes, legacy_traits: List[dict], legacy_units: List[dict]) -> Tuple[List[dict], List[dict]]:
+    """
+    Traits et unités d'un match, qu'il soit encodé (board) ou encore en JSON (lignes anciennes).
+    """
+    if board is not None:
+        return catalog.decode_board(board)
+    return legacy_traits or [], legacy_units or []
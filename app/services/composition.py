@@ -0,0 +1,60 @@
+import re
+from collections import Counter, namedtuple
+from functools import lru_cache
+from typing import List, Optional
+
+# Préfixe de set des identifiants Riot : "TFT13_Challenger", "TFT9b_Bruiser", "Set12_..."
+SET_PREFIX_RE = re.compile(r"^(?:TFT|Set)(\d+)[a-z]?_", re.IGNORECASE)
+PATCH_RE = re.compile(r"(\d+)\.(\d+)")
+
+Composition = namedtuple("Composition", ["stats_key", "name", "set_number"])
+
+
+def strip_set_prefix(name: str) -> str:
+    return SET_PREFIX_RE.sub("", name).lower()
+
+
+def parse_set_number(name: str) -> Optional[int]:
+    match = SET_PREFIX_RE.match(name)
+    return int(match.group(1)) if match else None
+
+
+def parse_patch(game_version: str) -> Optional[str]:
+    """
+    "Version 14.23.632.1234 (Nov 20 2024/...)" -> "14.23"
+    """
+    match = PATCH_RE.search(game_version or "")
+    return f"{match.group(1)}.{match.group(2)}" if match else None
+
+
+@lru_cache(maxsize=8192)
+def _classify(signature: tuple) -> Composition:
+    if not signature:
+        return Composition(None, "", None)
+
+    # Clé des stats : tous les traits au palier le plus élevé, triés par nom
+    max_tier = max(tier for _, tier, _ in signature)
+    stats_key = " ".join(sorted(strip_set_prefix(name) for name, tier, _ in signature if tier == max_tier))
+
+    # Nom affiché : les 2 traits les plus forts (palier puis nombre d'unités)
+    main_traits = sorted(signature, key=lambda t: (t[1], t[2]), reverse=True)[:2]
+    name = "-".join(strip_set_prefix(trait_name) for trait_name, _, _ in main_traits)
+
+    set_numbers = Counter(parse_set_number(trait_name) for trait_name, _, _ in signature)
+    set_numbers.pop(None, None)
+    set_number = set_numbers.most_common(1)[0][0] if set_numbers else None
+
+    return Composition(stats_key, name, set_number)
+
+
+def classify_traits(traits: List[dict]) -> Composition:
+    """
+    Classifieur canonique de composition, mémoïsé par signature de traits actifs.
+    Beaucoup de joueurs partagent les mêmes signatures : le cache absorbe l'essentiel.
+    """
+    signature = tuple(sorted(
+        (trait["name"], trait.get("tier_current", 0), trait.get("num_units", 0))
+        for trait in traits or []
+        if trait.get("tier_current", 0) > 0
+    ))
+    return _classify(signature)
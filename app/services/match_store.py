@@ -0,0 +1,129 @@
+import logging
+import os
+import re
+import json
+import zlib
+import hashlib
+from pathlib import Path
+from threading import Lock, get_ident
+from collections import OrderedDict
+from typing import Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+MATCH_ID_RE = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+class MatchStore:
+    """
+    Stockage des payloads bruts de matchs Riot (immuables une fois la partie terminée).
+    - tier chaud : LRU en mémoire de JSON compressés, borné en octets
+    - tier disque : objets adressés par contenu (sha256) + une référence par match_id
+    """
+
+    def __init__(self, directory: str, max_memory_bytes: int):
+        self.directory = Path(directory)
+        self.max_memory_bytes = max_memory_bytes
+        self._hot = OrderedDict()
+        self._hot_bytes = 0
+        self._lock = Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _ref_path(self, match_id: str) -> Path:
+        # Répartition sur l'empreinte du match_id : son préfixe est la plateforme (EUW1...)
+        shard = hashlib.sha1(match_id.encode()).hexdigest()[:2]
+        return self.directory / "refs" / shard / match_id
+
+    def _legacy_ref_path(self, match_id: str) -> Path:
+        # Ancienne répartition par préfixe de match_id, encore lue pour les stores existants
+        return self.directory / "refs" / match_id[:4] / match_id
+
+    def _read_ref(self, match_id: str) -> str:
+        try:
+            return self._ref_path(match_id).read_text().strip()
+        except FileNotFoundError:
+            return self._legacy_ref_path(match_id).read_text().strip()
+
+    def _object_path(self, digest: str) -> Path:
+        return self.directory / "objects" / digest[:2] / digest
+
+    def _remember(self, match_id: str, blob: bytes):
+        with self._lock:
+            previous = self._hot.pop(match_id, None)
+            if previous is not None:
+                self._hot_bytes -= len(previous)
+            self._hot[match_id] = blob
+            self._hot_bytes += len(blob)
+            while self._hot_bytes > self.max_memory_bytes and self._hot:
+                _, evicted = self._hot.popitem(last=False)
+                self._hot_bytes -= len(evicted)
+
+    def get(self, match_id: str) -> Optional[dict]:
+        if not MATCH_ID_RE.match(match_id):
+            return None
+
+        with self._lock:
+            blob = self._hot.get(match_id)
+            if blob is not None:
+                self._hot.move_to_end(match_id)
+                self.memory_hits += 1
+                return json.loads(zlib.decompress(blob))
+
+        try:
+            digest = self._read_ref(match_id)
+            blob = self._object_path(digest).read_bytes()
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.disk_hits += 1
+        self._remember(match_id, blob)
+        return json.loads(zlib.decompress(blob))
+
+    def put(self, match_id: str, match_data: dict):
+        if not MATCH_ID_RE.match(match_id):
+            return
+
+        raw = json.dumps(match_data, separators=(",", ":"), sort_keys=True).encode()
+        digest = hashlib.sha256(raw).hexdigest()
+        blob = zlib.compress(raw, 6)
+
+        try:
+            object_path = self._object_path(digest)
+            if not object_path.exists():
+                _atomic_write(object_path, blob)
+            _atomic_write(self._ref_path(match_id), digest.encode())
+        except OSError as e:
+            # Le disque n'est qu'un cache : on garde au moins le tier mémoire
+            logger.warning("Erreur lors de l'écriture du match %s sur disque : %s", match_id, e)
+
+        self._remember(match_id, blob)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "memory_entries": len(self._hot),
+                "memory_bytes": self._hot_bytes,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses
+            }
+
+
+def _atomic_write(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{get_ident()}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+match_store = MatchStore(
+    directory=settings.MATCH_STORE_DIR,
+    max_memory_bytes=settings.MATCH_STORE_MEMORY_MB * 1024 * 1024
+)
@@ -0,0 +1,117 @@
+import time
+import asyncio
+import multiprocessing
+from threading import Lock
+from concurrent.futures import ProcessPoolExecutor
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+from app.core.config import settings
+
+
+def _hash(password: str, rounds: int) -> tuple:
+    # Exécuté dans un process du pool : bcrypt ne bloque ni la boucle ni les threads de l'API
+    start = time.perf_counter()
+    hashed = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds).hash(password)
+    return hashed, time.perf_counter() - start
+
+
+def _verify(password: str, hashed_password: str) -> tuple:
+    start = time.perf_counter()
+    valid = CryptContext(schemes=["bcrypt"]).verify(password, hashed_password)
+    return valid, time.perf_counter() - start
+
+
+class PasswordHasher:
+    """
+    bcrypt sur un pool de process dédié, avec une file bornée.
+    File pleine : rejet immédiat (503) plutôt que d'accumuler de la latence.
+    """
+
+    def __init__(self, workers: int, max_queue: int, rounds: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.rounds = rounds
+        # Contexte local pour needs_rehash uniquement (lecture du coût dans le hash, pas de calcul)
+        self._context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds)
+        self._executor = None
+        self._lock = Lock()
+
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.total_compute = 0.0
+        self.max_latency = 0.0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn : pas de fork d'un process qui porte déjà des threads (workers, pools)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    async def _submit(self, fn, *args):
+        with self._lock:
+            if self.pending >= self.max_queue:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Service d'authentification saturé, réessayez dans un instant.",
+                    headers={"Retry-After": "1"}
+                )
+            self.pending += 1
+
+        start = time.perf_counter()
+        try:
+            result, compute = await asyncio.wrap_future(self._pool().submit(fn, *args))
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+        latency = time.perf_counter() - start
+        with self._lock:
+            self.completed += 1
+            self.total_compute += compute
+            self.total_wait += max(latency - compute, 0.0)
+            self.max_latency = max(self.max_latency, latency)
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(_hash, password, self.rounds)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._submit(_verify, password, hashed_password)
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        # Coût différent de PASSWORD_HASH_ROUNDS : le hash est refait au prochain login
+        return self._context.needs_update(hashed_password)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "rounds": self.rounds,
+                "queue_depth": self.pending,
+                "max_queue": self.max_queue,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_wait_ms": round(self.total_wait / self.completed * 1000, 2) if self.completed else 0.0,
+                "avg_compute_ms": round(self.total_compute / self.completed * 1000, 2) if self.completed else 0.0,
+                "max_latency_ms": round(self.max_latency * 1000, 2)
+            }
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+    rounds=settings.PASSWORD_HASH_ROUNDS
+)
@@ -0,0 +1,74 @@
+import hashlib
+from threading import Lock
+from collections import OrderedDict, namedtuple
+from typing import Optional
+from app.core.config import settings
+
+CachedResponse = namedtuple("CachedResponse", ["generation", "etag", "body"])
+
+
+class ResponseCache:
+    """
+    Cache LRU des réponses JSON par utilisateur, borné en octets.
+    Clé : (user_id, chemin, paramètres). Une entrée n'est valable que pour la
+    génération de données de l'utilisateur (User.data_generation) qui l'a produite.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, key: tuple, generation: int) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.generation != generation:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: tuple, generation: int, body: bytes) -> CachedResponse:
+        # ETag fort : empreinte exacte du corps servi
+        entry = CachedResponse(generation, f'"{hashlib.sha256(body).hexdigest()[:32]}"', body)
+        if len(body) > self.max_bytes:
+            return entry
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous.body)
+            self._entries[key] = entry
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.body)
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def record_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified
+            }
+
+
+response_cache = ResponseCache(max_bytes=settings.RESPONSE_CACHE_MB * 1024 * 1024)
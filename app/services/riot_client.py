@@ -0,0 +1,146 @@
+import time
+import requests
+from threading import Lock
+from typing import Callable, Iterable, List
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from app.core.config import settings
+from app.core.metrics import registry
+from app.services.riot_rate_limiter import RiotRateLimiter
+from app.services.single_flight import SingleFlight
+
+RIOT_BASE_URL = "https://{host}.api.riotgames.com"
+
+# Appels HTTP réels vers Riot (chaque tentative compte, les appels mutualisés une seule fois)
+riot_request_duration = registry.histogram(
+    "riot_request_duration_seconds",
+    "Durée des appels à l'API Riot par méthode et région",
+    ["method", "region"]
+)
+riot_responses = registry.counter(
+    "riot_responses_total",
+    "Réponses de l'API Riot par méthode, région et statut (error : pas de réponse)",
+    ["method", "region", "status"]
+)
+riot_rate_limited = registry.counter(
+    "riot_rate_limited_total",
+    "Réponses 429 de l'API Riot par méthode et région",
+    ["method", "region"]
+)
+riot_response_bytes = registry.counter(
+    "riot_response_bytes_total",
+    "Octets reçus de l'API Riot par méthode et région",
+    ["method", "region"]
+)
+
+
+class RiotClient:
+    """
+    Client HTTP partagé vers l'API Riot.
+    Une session keep-alive (pool de connexions) par hôte régional, et un pool
+    de threads borné pour paralléliser les appels indépendants.
+    Chaque appel passe par le limiteur de débit (si fourni) et un 429 est
+    rejoué après Retry-After au lieu de remonter directement à l'appelant.
+    Les appels identiques en cours sont mutualisés (single-flight).
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = RIOT_BASE_URL,
+        pool_size: int = 10,
+        max_workers: int = 5,
+        timeout: float = 10.0,
+        rate_limiter: RiotRateLimiter = None,
+        max_retries: int = 3
+    ):
+        self.base_url = base_url
+        self.headers = {"X-Riot-Token": api_key}
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.single_flight = SingleFlight()
+        self._sessions = {}
+        self._lock = Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="riot")
+
+    def _session(self, host: str) -> requests.Session:
+        session = self._sessions.get(host)
+        if session is not None:
+            return session
+
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                session.headers.update(self.headers)
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[host] = session
+        return session
+
+    def url(self, host: str, path: str) -> str:
+        return self.base_url.format(host=host) + path
+
+    def get(self, host: str, path: str, params: dict = None, method: str = "default") -> requests.Response:
+        # Appels identiques simultanés (même hôte, chemin et paramètres) : une seule requête Riot
+        key = (host, path, tuple(sorted((params or {}).items())))
+        return self.single_flight.do(key, lambda: self._get(host, path, params, method))
+
+    def _get(self, host: str, path: str, params: dict, method: str) -> requests.Response:
+        session = self._session(host)
+        url = self.url(host, path)
+
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter:
+                self.rate_limiter.acquire(host, method)
+            response = self._send(session, url, params, host, method)
+            if not self.rate_limiter:
+                return response
+
+            self.rate_limiter.update(host, method, response.headers)
+            if response.status_code != 429 or attempt == self.max_retries:
+                return response
+            self.rate_limiter.penalize(host, method, response.headers)
+
+        return response
+
+    def _send(self, session: requests.Session, url: str, params: dict, host: str, method: str) -> requests.Response:
+        # Le temps mesuré exclut l'attente du limiteur de débit
+        labels = (method, host)
+        start = time.perf_counter()
+        try:
+            response = session.get(url, params=params, timeout=self.timeout)
+        except requests.RequestException:
+            riot_request_duration.observe(labels, time.perf_counter() - start)
+            riot_responses.inc(labels + ("error",))
+            raise
+        riot_request_duration.observe(labels, time.perf_counter() - start)
+        riot_responses.inc(labels + (str(response.status_code),))
+        riot_response_bytes.inc(labels, len(response.content))
+        if response.status_code == 429:
+            riot_rate_limited.inc(labels)
+        return response
+
+    def map(self, fn: Callable, items: Iterable) -> List:
+        # Fan-out borné par max_workers, l'ordre des résultats suit celui des entrées
+        return list(self._executor.map(fn, items))
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+riot_client = RiotClient(
+    api_key=settings.RIOT_API_KEY,
+    pool_size=settings.RIOT_POOL_SIZE,
+    max_workers=settings.RIOT_MAX_WORKERS,
+    timeout=settings.RIOT_TIMEOUT,
+    rate_limiter=RiotRateLimiter(settings.RIOT_APP_RATE_LIMIT),
+    max_retries=settings.RIOT_MAX_RETRIES
+)
@@ -0,0 +1,187 @@
+import time
+from collections import deque
+from threading import Condition
+from typing import Dict, List, Tuple
+
+# Historique gardé tant qu'aucune limite n'est connue (fenêtre Riot la plus longue : 10 min)
+UNKNOWN_LIMITS_HORIZON = 600.0
+
+
+def parse_rate_limits(header: str) -> List[Tuple[int, float]]:
+    """
+    Parse un en-tête Riot du type "20:1,100:120" en [(20, 1.0), (100, 120.0)].
+    """
+    limits = []
+    for part in (header or "").split(","):
+        try:
+            count, window = part.strip().split(":")
+            limits.append((int(count), float(window)))
+        except ValueError:
+            continue
+    return limits
+
+
+class RateLimitBucket:
+    """
+    Seau de requêtes pour une clé (routing value ou routing value + méthode).
+    Chaque limite (n requêtes / fenêtre) est suivie en fenêtre glissante,
+    ce qui colle aux fenêtres Riot sans jamais les dépasser.
+    Une file d'horodatages par limite, purgée par la gauche : O(1) amorti par appel.
+    """
+
+    def __init__(self, limits: List[Tuple[int, float]] = None):
+        self.limits = []
+        self.windows = []
+        # Appels faits avant de connaître les limites : comptés dès qu'elles sont apprises
+        self.pending = deque()
+        self.blocked_until = 0.0
+        self.set_limits(limits or [])
+
+    def set_limits(self, limits: List[Tuple[int, float]]):
+        limits = sorted(limits, key=lambda limit: limit[1])
+        if limits == self.limits:
+            return
+        # Les nouvelles fenêtres reprennent les appels déjà faits (les expirés sont purgés ensuite)
+        history = self.windows[-1][2] if self.windows else self.pending
+        self.limits = limits
+        self.windows = [(count, window, deque(history)) for count, window in limits]
+        self.pending = deque() if limits else deque(history)
+
+    def wait_time(self, now: float) -> float:
+        wait = self.blocked_until - now
+        for count, window, history in self.windows:
+            # Seules les requêtes encore comptées dans cette fenêtre restent dans la file
+            while history and history[0] <= now - window:
+                history.popleft()
+            if len(history) >= count:
+                wait = max(wait, history[len(history) - count] + window - now)
+        return wait
+
+    def consume(self, now: float):
+        if not self.windows:
+            self.pending.append(now)
+            while self.pending[0] <= now - UNKNOWN_LIMITS_HORIZON:
+                self.pending.popleft()
+            return
+        for _, _, history in self.windows:
+            history.append(now)
+
+    def block(self, until: float):
+        self.blocked_until = max(self.blocked_until, until)
+
+
+class RiotRateLimiter:
+    """
+    Ordonnanceur des appels sortants vers Riot.
+    Les limites applicatives (par routing value) et par méthode sont apprises
+    depuis les en-têtes X-App-Rate-Limit / X-Method-Rate-Limit, et un 429
+    bloque le seau concerné pendant Retry-After.
+    """
+
+    def __init__(self, default_app_limits: str = ""):
+        self.default_app_limits = parse_rate_limits(default_app_limits)
+        self._cond = Condition()
+        self._app: Dict[str, RateLimitBucket] = {}
+        self._methods: Dict[Tuple[str, str], RateLimitBucket] = {}
+
+        self.queue_depth = 0
+        self.requests = 0
+        self.delayed = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _buckets(self, routing: str, method: str) -> Tuple[RateLimitBucket, RateLimitBucket]:
+        app_bucket = self._app.get(routing)
+        if app_bucket is None:
+            app_bucket = self._app[routing] = RateLimitBucket(self.default_app_limits)
+        method_bucket = self._methods.get((routing, method))
+        if method_bucket is None:
+            method_bucket = self._methods[(routing, method)] = RateLimitBucket()
+        return app_bucket, method_bucket
+
+    def acquire(self, routing: str, method: str):
+        start = time.monotonic()
+        queued = False
+
+        with self._cond:
+            app_bucket, method_bucket = self._buckets(routing, method)
+            while True:
+                now = time.monotonic()
+                wait = max(app_bucket.wait_time(now), method_bucket.wait_time(now))
+                if wait <= 0:
+                    app_bucket.consume(now)
+                    method_bucket.consume(now)
+                    break
+                if not queued:
+                    queued = True
+                    self.queue_depth += 1
+                self._cond.wait(wait)
+
+            waited = time.monotonic() - start
+            self.requests += 1
+            if queued:
+                self.queue_depth -= 1
+                self.delayed += 1
+                self.total_wait += waited
+                self.max_wait = max(self.max_wait, waited)
+
+    def update(self, routing: str, method: str, headers):
+        app_limits = parse_rate_limits(headers.get("X-App-Rate-Limit"))
+        method_limits = parse_rate_limits(headers.get("X-Method-Rate-Limit"))
+        if not app_limits and not method_limits:
+            return
+
+        with self._cond:
+            app_bucket, method_bucket = self._buckets(routing, method)
+            if app_limits:
+                app_bucket.set_limits(app_limits)
+            if method_limits:
+                method_bucket.set_limits(method_limits)
+
+    def penalize(self, routing: str, method: str, headers):
+        """
+        À appeler sur une réponse 429 : bloque le seau fautif jusqu'à Retry-After.
+        """
+        try:
+            retry_after = float(headers.get("Retry-After", 1))
+        except ValueError:
+            retry_after = 1.0
+        limit_type = headers.get("X-Rate-Limit-Type", "")
+
+        with self._cond:
+            app_bucket, method_bucket = self._buckets(routing, method)
+            until = time.monotonic() + retry_after
+            if limit_type == "application":
+                app_bucket.block(until)
+            else:
+                # "method" ou "service" : seule cette méthode est concernée
+                method_bucket.block(until)
+            self.throttled += 1
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            now = time.monotonic()
+            return {
+                "queue_depth": self.queue_depth,
+                "requests": self.requests,
+                "delayed": self.delayed,
+                "throttled": self.throttled,
+                "avg_wait_ms": round(self.total_wait / self.delayed * 1000, 2) if self.delayed else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 2),
+                "app_limits": {
+                    routing: {
+                        "limits": [f"{count}:{int(window)}" for count, window in bucket.limits],
+                        "wait_ms": round(max(bucket.wait_time(now), 0) * 1000, 2)
+                    }
+                    for routing, bucket in self._app.items()
+                },
+                "method_limits": {
+                    f"{routing}/{method}": {
+                        "limits": [f"{count}:{int(window)}" for count, window in bucket.limits],
+                        "wait_ms": round(max(bucket.wait_time(now), 0) * 1000, 2)
+                    }
+                    for (routing, method), bucket in self._methods.items()
+                }
+            }
@@ -1,15 +1,49 @@
-import requests
-from typing import List
+import logging
+from typing import Dict, List
 from datetime import datetime
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
-from collections import defaultdict
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from app.core.config import settings
+from app.core.database import dialect_insert
+from app.core.security import principal_cache
 from app.models.match import Match
+from app.models.user import User
+from app.models.match_unit import MatchUnit
+from app.models.match_trait import MatchTrait
+from app.services.riot_client import riot_client
+from app.services.match_store import match_store
+from app.services.catalog import catalog
+from app.services.ttl_cache import TTLCache
+from app.services.aggregate_service import apply_aggregates, bump_data_generation
+from app.services.composition import classify_traits, parse_patch, strip_set_prefix
+
+logger = logging.getLogger(__name__)
 
-API_KEY = settings.RIOT_API_KEY
-HEADERS = { "X-Riot-Token": API_KEY }
 VALID_REGION = {"europe", "americas", "asia", "esport"}
+# Plateforme utilisée quand Riot ne connaît pas de shard actif pour le joueur
+DEFAULT_PLATFORM = {"europe": "euw1", "americas": "na1", "asia": "kr", "esport": "euw1"}
+INGEST_BATCH_SIZE = 500
+
+account_cache = TTLCache(
+    ttl=settings.RIOT_ACCOUNT_CACHE_TTL,
+    stale_ttl=settings.RIOT_CACHE_STALE_SECONDS,
+    max_entries=settings.RIOT_CACHE_MAX_ENTRIES
+)
+# Recherches groupées (get_summoners_info), bornées comme le client Riot
+lookup_executor = ThreadPoolExecutor(max_workers=settings.RIOT_MAX_WORKERS, thread_name_prefix="riot-lookup")
+summoner_cache = TTLCache(
+    ttl=settings.RIOT_SUMMONER_CACHE_TTL,
+    stale_ttl=settings.RIOT_CACHE_STALE_SECONDS,
+    max_entries=settings.RIOT_CACHE_MAX_ENTRIES
+)
+
+def raise_riot_error(response):
+    raise HTTPException(
+        status_code=response.status_code,
+        detail=f"Erreur API Riot: {response.status_code} - {response.text}"
+    )
 
 def get_puuid_from_riot(game_name: str, tag_line: str, region: str):
     # Traitement des données reçues
@@ -19,48 +53,86 @@ def get_puuid_from_riot(game_name: str, tag_line: str, region: str):
     if region not in VALID_REGION:
         raise HTTPException(status_code=400, detail="Région Invalide")
     
-    url = f"https://{region}.api.riotgames.com/riot/account/v1/accounts/by-riot-id/{game_name}/{tag_line}"
+    def load():
+        response = riot_client.get(region, f"/riot/account/v1/accounts/by-riot-id/{game_name}/{tag_line}", method="account-v1.by-riot-id")
+        if response.status_code != 200:
+            raise_riot_error(response)
+        return response.json()["puuid"]
     
-    response = requests.get(url, headers=HEADERS)
+    # Un riot id ne change (presque) jamais de puuid
+    return account_cache.get_or_load(("puuid", game_name, tag_line, region), load)
+
+def get_platform(puuid: str, region: str) -> str:
+    """
+    Plateforme (euw1, na1, kr...) du joueur, d'après son shard TFT actif.
+    """
+    def load():
+        response = riot_client.get(region, f"/riot/account/v1/active-shards/by-game/tft/by-puuid/{puuid}", method="account-v1.active-shards")
+        if response.status_code == 200:
+            return response.json()["activeShard"]
+        if response.status_code == 404:
+            return DEFAULT_PLATFORM[region]
+        raise_riot_error(response)
     
-    if response.status_code == 200:
-        return response.json()["puuid"]
-    else:
-        raise HTTPException(
-            status_code=response.status_code,
-            detail=f"Erreur API Riot: {response.status_code} - {response.text}"
-        )
+    return account_cache.get_or_load(("platform", puuid), load)
         
-def get_recent_match_ids(puuid: str, region: str, count: int = 10) -> List[str]:
+def get_recent_match_ids(puuid: str, region: str, count: int = 10, start: int = 0, start_time: int = None) -> List[str]:
     if region not in VALID_REGION:
         raise HTTPException(status_code=400, detail="Région invalide")
     
-    url = f"https://{region}.api.riotgames.com/tft/match/v1/matches/by-puuid/{puuid}/ids?count={count}"
-    response = requests.get(url, headers=HEADERS)
+    params = {"start": start, "count": count}
+    if start_time is not None:
+        # Epoch en secondes : seuls les matchs joués après sont renvoyés
+        params["startTime"] = start_time
+    
+    response = riot_client.get(region, f"/tft/match/v1/matches/by-puuid/{puuid}/ids", params=params, method="tft-match-v1.ids")
     
     if response.status_code == 200:
         return response.json()
     else:
-        raise HTTPException(
-            status_code=response.status_code,
-            detail=f"Erreur API Riot: {response.status_code} - {response.text}"
-        )
+        raise_riot_error(response)
         
 def get_match_details(match_id: str, region: str):
     region = region.lower()
     if region not in VALID_REGION:
         raise HTTPException(status_code=400, detail="Région invalide")
     
-    url = f"https://{region}.api.riotgames.com/tft/match/v1/matches/{match_id}"
-    response = requests.get(url, headers=HEADERS)
+    # Un match terminé ne change plus : on ne le télécharge qu'une seule fois
+    match_data = match_store.get(match_id)
+    if match_data is not None:
+        return match_data
+    
+    response = riot_client.get(region, f"/tft/match/v1/matches/{match_id}", method="tft-match-v1.match")
     
     if response.status_code == 200:
-        return response.json()
+        match_data = response.json()
+        match_store.put(match_id, match_data)
+        return match_data
     else:
-        raise HTTPException(
-            status_code=response.status_code,
-            detail=f"Erreur API Riot: {response.status_code} - {response.text}"
-        )
+        raise_riot_error(response)
+        
+def get_matches_details(match_ids: List[str], region: str) -> Dict[str, dict]:
+    """
+    Récupère les détails de plusieurs matchs en parallèle (fan-out borné par le client).
+    Les matchs en erreur sont ignorés, l'ordre de match_ids est conservé.
+    """
+    region = region.lower()
+    if region not in VALID_REGION:
+        raise HTTPException(status_code=400, detail="Région invalide")
+    
+    def fetch(match_id):
+        try:
+            return get_match_details(match_id, region)
+        except Exception as e:
+            logger.warning("Erreur lors de la récupération du match %s : %s", match_id, e)
+            return None
+    
+    results = riot_client.map(fetch, match_ids)
+    return {
+        match_id: match_data
+        for match_id, match_data in zip(match_ids, results)
+        if match_data is not None
+    }
         
 def extract_player_data(match_data: dict, puuid: str) -> dict:
     # print(puuid == "ms0UplvcaeM55brRe0Ib-_iBvXz2nkIcLJM_1z3_NJQGwfRFpg-oqpFdfRMyrAWiubx7R_bhbQ7opA")
@@ -111,22 +183,28 @@ def extract_player_data(match_data: dict, puuid: str) -> dict:
     except KeyError as e:
         raise HTTPException(status_code=500, detail=f"Erreur lors de l'extraction des données du joueur: {e}")
     
+def match_to_player_data(match: Match) -> dict:
+    """
+    Même format que extract_player_data, à partir d'un match déjà stocké en base.
+    """
+    return {
+        "placement": match.placement,
+        "level": match.level,
+        "gold_left": match.gold_left,
+        "last_round": match.last_round,
+        "traits": match.traits or [],
+        "units": match.units or []
+    }
+    
 
 def compute_stats_by_traits(matches: List[Match]) -> dict:
     stats = defaultdict(lambda: {"wins": 0, "games": 0, "total_placement": 0})
     
     for match in matches:
-        traits = match.traits
-        if not traits:
+        trait_key = classify_traits(match.traits).stats_key
+        if trait_key is None:
             continue
         
-        sorted_traits = sorted(traits, key=lambda x: x["tier_current"], reverse=True)
-        
-        max_tier = sorted_traits[0]["tier_current"]
-        main_traits = [t["name"].replace("TFT13_", "").lower() for t in sorted_traits if t["tier_current"] == max_tier]
-        
-        trait_key = " ".join(sorted(main_traits))
-        
         stats[trait_key]["games"] += 1
         stats[trait_key]["total_placement"] += match.placement
         if match.placement <= 4:
@@ -149,84 +227,251 @@ def compute_stats_by_traits(matches: List[Match]) -> dict:
     return result
 
 
-def detect_main_composition(traits: dict) -> str:
+def compute_top_units(matches: List[Match], top: int = 5) -> List[dict]:
     """
-    Détecte la composition principale basée sur les traits activés (tier_current > 0).
-    Retourne une chaîne formatée du type "challenger-bastion"
+    Implémentation de référence (Python pur) des top unités, utilisée pour
+    vérifier le moteur vectorisé de stats_engine.
     """
-    # On filtre les traits actifs
-    active_traits = [trait for trait in traits if trait["tier_current"] > 0]
-
-    # On trie d'abord par `tier_current`, puis par `num_units` pour départager les égalités
-    sorted_traits = sorted(
-        active_traits,
-        key=lambda t: (t["tier_current"], t["num_units"]),
-        reverse=True
-    )
-
-    # On prend les 2 traits les plus forts (ou 1 seul si pas assez)
-    main_traits = sorted_traits[:2]
-    names = [trait["name"].replace("TFT13_", "").lower() for trait in main_traits]
-
-    return "-".join(names)
+    unit_counter = Counter()
+    win_counter = Counter()
+    
+    for match in matches:
+        placement = match.placement
+        for unit in match.units:
+            cid = unit["character_id"]
+            unit_counter[cid] += 1
+            if placement <= 4:
+                win_counter[cid] += 1
+    
+    top_units = sorted(unit_counter.items(), key=lambda item: (-item[1], item[0]))[:top]
+    
+    return [
+        {
+            "character_id": cid,
+            "count": count,
+            "winrate": round((win_counter[cid] / count) * 100, 2) if count > 0 else 0.0
+        }
+        for cid, count in top_units
+    ]
 
 
-def store_match_if_not_exists(db: Session, match_data: dict, puuid: str, user_id: int):
-    match_id = match_data["metadata"]["match_id"]
+def compute_top_traits(matches: List[Match], top: int = 5) -> List[dict]:
+    """
+    Implémentation de référence (Python pur) des top traits.
+    """
+    trait_counter = Counter()
+    win_counter = Counter()
     
-    existing = db.query(Match).filter_by(match_id=match_id).first()
-    if existing:
-        return
+    for match in matches:
+        placement = match.placement
+        for trait in match.traits:
+            tn = trait["name"]
+            trait_counter[tn] += 1
+            if placement <= 4:
+                win_counter[tn] += 1
+    
+    top_traits = sorted(trait_counter.items(), key=lambda item: (-item[1], item[0]))[:top]
     
+    return [
+        {
+            "name": strip_set_prefix(tn),
+            "count": count,
+            "winrate": round((win_counter[tn] / count) * 100, 2) if count > 0 else 0.0
+        }
+        for tn, count in top_traits
+    ]
+
+
+def build_match_row(match_data: dict, puuid: str, user_id: int) -> dict:
+    """
+    Transforme un payload Riot en ligne prête à insérer dans `matches`.
+    """
     player_data = extract_player_data(match_data, puuid)
-    composition_name = detect_main_composition(player_data["traits"])
+    composition = classify_traits(player_data["traits"])
     timestamp_ms = match_data["info"]["game_datetime"]
     played_at = datetime.fromtimestamp(timestamp_ms / 1000)
     
-    match = Match(
-        match_id=match_id,
-        puuid=puuid,
-        user_id=user_id,
-        placement=player_data["placement"],
-        level=player_data["level"],
-        gold_left=player_data["gold_left"],
-        last_round=player_data["last_round"],
-        composition_name=composition_name,
-        traits=player_data["traits"],
-        units=player_data["units"],
-        played_at=played_at
+    return {
+        "match_id": match_data["metadata"]["match_id"],
+        "puuid": puuid,
+        "user_id": user_id,
+        "placement": player_data["placement"],
+        "level": player_data["level"],
+        "gold_left": player_data["gold_left"],
+        "last_round": player_data["last_round"],
+        "composition_name": composition.name,
+        "traits": player_data["traits"],
+        "units": player_data["units"],
+        "played_at": played_at,
+        # Colonnes dérivées, calculées une seule fois à l'ingestion
+        "stats_key": composition.stats_key,
+        "top4": player_data["placement"] <= 4,
+        "set_number": match_data["info"].get("tft_set_number") or composition.set_number,
+        "patch": parse_patch(match_data["info"].get("game_version"))
+    }
+
+
+def build_lobby_rows(db: Session, matches_data: List[dict]) -> List[dict]:
+    """
+    Une ligne par utilisateur lié présent dans chaque lobby : un match téléchargé
+    une fois alimente l'historique de tous ses participants connus.
+    Une seule requête pour retrouver les utilisateurs liés de tous les matchs.
+    """
+    participants = {
+        p["puuid"]
+        for match_data in matches_data
+        for p in match_data["info"]["participants"]
+    }
+    if not participants:
+        return []
+    
+    linked_users = dict(
+        db.query(User.puuid, User.id).filter(User.puuid.in_(participants)).all()
     )
     
-    db.add(match)
-    db.commit()
+    rows = []
+    for match_data in matches_data:
+        for p in match_data["info"]["participants"]:
+            user_id = linked_users.get(p["puuid"])
+            if user_id is not None:
+                rows.append(build_match_row(match_data, p["puuid"], user_id))
+    return rows
+
+
+def build_detail_rows(match_pk: int, traits: List[dict], units: List[dict]) -> tuple:
+    """
+    Lignes normalisées (match_units, match_traits) d'un match déjà inséré.
+    """
+    unit_rows = [
+        {
+            "match_pk": match_pk,
+            "character_id": unit["character_id"],
+            "tier": unit.get("tier", 0),
+            "items": unit.get("items", [])
+        }
+        for unit in units or []
+    ]
+    trait_rows = [
+        {
+            "match_pk": match_pk,
+            "name": trait["name"],
+            "tier_current": trait.get("tier_current", 0),
+            "num_units": trait.get("num_units", 0)
+        }
+        for trait in traits or []
+    ]
+    return unit_rows, trait_rows
+
+
+def ingest_matches(db: Session, rows: List[dict]) -> dict:
+    """
+    Insère un lot de matchs en une seule transaction (INSERT ... ON CONFLICT DO NOTHING).
+    Idempotent et sans course entre deux rafraîchissements concurrents.
+    Retourne le nombre de lignes insérées et ignorées (déjà présentes).
+    """
+    if not rows:
+        return {"inserted": 0, "skipped": 0}
     
-def get_summoner_info(game_name: str, tag_line: str, region: str) -> dict:
-    if region not in VALID_REGION:
-        raise HTTPException(status_code=400, detail="Région invalide")
+    inserted = 0
+    updated_users = set()
+    rows_by_key = {(row["match_id"], row["puuid"]): row for row in rows}
     
-    account_url = f"https://{region}.api.riotgames.com/riot/account/v1/accounts/by-riot-id/{game_name}/{tag_line}"
-    account_res = requests.get(url=account_url, headers=HEADERS)
-    if account_res.status_code != 200:
-        raise HTTPException(status_code=account_res.status_code, detail="Compte Riot introuvable")
-    puuid = account_res.json()["puuid"]
+    # traits / units sont stockés sous forme de plateau encodé (catalogue).
+    # Tout est encodé avant le premier INSERT : les nouveaux noms sont committés sur une
+    # autre connexion, qui attendrait sinon le verrou d'écriture de cette transaction.
+    boards = catalog.encode_boards([(row["traits"], row["units"]) for row in rows], db.get_bind())
     
-    summoner_url = f"https://euw1.api.riotgames.com/tft/summoner/v1/summoners/by-puuid/{puuid}"
-    summoner_res = requests.get(url=summoner_url, headers=HEADERS)
+    for start in range(0, len(rows), INGEST_BATCH_SIZE):
+        batch = rows[start:start + INGEST_BATCH_SIZE]
+        values = [
+            {**{k: v for k, v in row.items() if k not in ("traits", "units")}, "board": board}
+            for row, board in zip(batch, boards[start:start + INGEST_BATCH_SIZE])
+        ]
+        stmt = (
+            dialect_insert(db, Match)
+            .values(values)
+            .on_conflict_do_nothing(index_elements=["match_id", "puuid"])
+            .returning(Match.id, Match.match_id, Match.puuid)
+        )
+        inserted_rows = db.execute(stmt).fetchall()
+        inserted += len(inserted_rows)
+        
+        # Tables normalisées, dans la même transaction, pour les seuls matchs insérés
+        unit_rows, trait_rows = [], []
+        for match_pk, match_id, puuid in inserted_rows:
+            row = rows_by_key[(match_id, puuid)]
+            units, traits = build_detail_rows(match_pk, row["traits"], row["units"])
+            unit_rows.extend(units)
+            trait_rows.extend(traits)
+        if unit_rows:
+            db.execute(MatchUnit.__table__.insert(), unit_rows)
+        if trait_rows:
+            db.execute(MatchTrait.__table__.insert(), trait_rows)
+        
+        # Agrégats par utilisateur, dans la même transaction que l'insertion
+        inserted_batch = [rows_by_key[(match_id, puuid)] for _, match_id, puuid in inserted_rows]
+        apply_aggregates(db, inserted_batch)
+        updated_users.update(row["user_id"] for row in inserted_batch)
+    
+    bump_data_generation(db, updated_users)
+    db.commit()
+    # Nouvelle génération de données : les utilisateurs en cache doivent être rechargés
+    for user_id in updated_users:
+        principal_cache.invalidate(user_id)
+    return {"inserted": inserted, "skipped": len(rows) - inserted}
+
+
+def ingest_match_ids(db: Session, puuid: str, region: str, match_ids: List[str]) -> dict:
+    """
+    Télécharge et ingère les matchs de match_ids pas encore connus pour ce joueur.
+    Une requête d'existence, un fan-out Riot borné, une transaction d'écriture.
+    """
+    known_ids = {
+        match_id
+        for (match_id,) in db.query(Match.match_id).filter(
+            Match.match_id.in_(match_ids),
+            Match.puuid == puuid
+        )
+    }
+    unknown_ids = [match_id for match_id in match_ids if match_id not in known_ids]
+    if not unknown_ids:
+        return {"inserted": 0, "skipped": 0}
+    
+    matches_data = get_matches_details(unknown_ids, region)
+    return ingest_matches(db, build_lobby_rows(db, list(matches_data.values())))
+
+
+def store_match_if_not_exists(db: Session, match_data: dict, puuid: str, user_id: int):
+    ingest_matches(db, [build_match_row(match_data, puuid, user_id)])
+    
+def load_summoner_profile(puuid: str, platform: str) -> tuple:
+    """
+    Invocateur et classement : indépendants l'un de l'autre, appelés en parallèle.
+    """
+    summoner_res, league_res = riot_client.map(lambda call: riot_client.get(platform, *call), [
+        (f"/tft/summoner/v1/summoners/by-puuid/{puuid}", None, "tft-summoner-v1.by-puuid"),
+        (f"/tft/league/v1/by-puuid/{puuid}", None, "tft-league-v1.by-puuid"),
+    ])
     if summoner_res.status_code != 200:
         raise HTTPException(status_code=summoner_res.status_code, detail="Invocateur introuvable")
-    summoner_data = summoner_res.json()
-    
-    summoner_id = summoner_data["id"]
-    league_url = f"https://euw1.api.riotgames.com/tft/league/v1/entries/by-summoner/{summoner_id}"
-    league_res = requests.get(url=league_url, headers=HEADERS)
     if league_res.status_code != 200:
         raise HTTPException(status_code=league_res.status_code, detail="Classement introuvable")
-    league_data = league_res.json()
+    return summoner_res.json(), league_res.json()
+
+def get_summoner_info(game_name: str, tag_line: str, region: str) -> dict:
+    if region not in VALID_REGION:
+        raise HTTPException(status_code=400, detail="Région invalide")
+    
+    puuid = get_puuid_from_riot(game_name, tag_line, region)
+    platform = get_platform(puuid, region)
+    summoner_data, league_data = summoner_cache.get_or_load(
+        puuid, lambda: load_summoner_profile(puuid, platform)
+    )
     
     tft_ranked = next((entry for entry in league_data if entry["queueType"] == "RANKED_TFT"), None)
     
     return {
-                "game_name": game_name,
+        "game_name": game_name,
         "tag_line": tag_line,
         "summoner_level": summoner_data["summonerLevel"],
         "profile_icon_id": summoner_data["profileIconId"],
@@ -236,4 +481,23 @@ def get_summoner_info(game_name: str, tag_line: str, region: str) -> dict:
         "wins": tft_ranked["wins"] if tft_ranked else 0,
         "losses": tft_ranked["losses"] if tft_ranked else 0,
         "hot_streak": tft_ranked["hotStreak"] if tft_ranked else False,
-    }
\ No newline at end of file
+    }
+
+def get_summoners_info(accounts: List[tuple]) -> List[dict]:
+    """
+    get_summoner_info pour plusieurs (game_name, tag_line, region) en parallèle.
+    Résultats partiels : chaque entrée porte soit "summoner", soit "error".
+    Le pool est distinct de celui du client Riot, que get_summoner_info utilise lui-même.
+    """
+    def lookup(account):
+        game_name, tag_line, region = (value.lower() for value in account)
+        item = {"game_name": game_name, "tag_line": tag_line, "region": region}
+        try:
+            item["summoner"] = get_summoner_info(game_name, tag_line, region)
+        except HTTPException as e:
+            item["error"] = {"status_code": e.status_code, "detail": str(e.detail)}
+        except Exception as e:
+            item["error"] = {"status_code": 502, "detail": f"Erreur API Riot: {e}"}
+        return item
+    
+    return list(lookup_executor.map(lookup, accounts))
@@ -0,0 +1,52 @@
+from threading import Lock
+from concurrent.futures import Future
+from typing import Callable, Hashable
+
+
+class SingleFlight:
+    """
+    Regroupe les appels identiques simultanés : le premier appelant exécute fn,
+    les suivants attendent et partagent son résultat (ou son exception).
+    Rien n'est conservé une fois l'appel terminé (ce n'est pas un cache).
+    """
+
+    def __init__(self):
+        self._in_flight = {}
+        self._lock = Lock()
+
+        self.calls = 0
+        self.deduplicated = 0
+
+    def do(self, key: Hashable, fn: Callable):
+        with self._lock:
+            self.calls += 1
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.deduplicated += 1
+                leader = False
+            else:
+                future = self._in_flight[key] = Future()
+                leader = True
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "deduplicated": self.deduplicated,
+                "in_flight": len(self._in_flight)
+            }
@@ -0,0 +1,208 @@
+import numpy as np
+from typing import Iterable, List, Optional
+from sqlalchemy.orm import Session
+from app.models.match import Match
+from app.services.composition import classify_traits, strip_set_prefix
+from app.services.catalog import catalog, match_board
+from app.services.stats_service import StatsFilters, filter_matches
+
+# Sert les calculs sans agrégat maintenu (/games/unit-items). Les stats de compositions,
+# unités et traits restent lues dans user_stats / user_daily_stats (stats_service) :
+# une lecture indexée par clé, sans recharger tout l'historique du joueur à chaque requête.
+
+
+class Vocabulary:
+    """
+    Encodage dictionnaire : noms triés -> identifiants entiers contigus.
+    L'ordre des ids suit l'ordre alphabétique, ce qui donne le départage des égalités gratuitement.
+    """
+
+    def __init__(self, names: Iterable[str]):
+        self.names = sorted(set(names))
+        self.ids = {name: i for i, name in enumerate(self.names)}
+
+    def __len__(self):
+        return len(self.names)
+
+    def encode(self, names: List[str]) -> np.ndarray:
+        return np.fromiter((self.ids[name] for name in names), dtype=np.int32, count=len(names))
+
+
+class MatchColumns:
+    """
+    Historique d'un joueur en colonnes compactes :
+    - placement : int8 par match
+    - composition : id de clé de stats par match (-1 si aucune)
+    - unités / traits : ids par occurrence + offsets par match (CSR)
+    - items : ids par occurrence + offsets par unité
+    """
+
+    def __init__(self, rows: Iterable[tuple]):
+        placements, compositions = [], []
+        unit_names, unit_counts, item_names, item_counts = [], [], [], []
+        trait_names, trait_counts = [], []
+
+        for placement, stats_key, traits, units in rows:
+            placements.append(placement)
+            compositions.append(stats_key if stats_key is not None else classify_traits(traits).stats_key)
+            traits = traits or []
+            units = units or []
+            trait_names.extend(trait["name"] for trait in traits)
+            trait_counts.append(len(traits))
+            unit_names.extend(unit["character_id"] for unit in units)
+            unit_counts.append(len(units))
+            for unit in units:
+                items = unit.get("items") or []
+                item_names.extend(items)
+                item_counts.append(len(items))
+
+        self.placement = np.asarray(placements, dtype=np.int8)
+        self.top4 = self.placement <= 4
+
+        self.compositions = Vocabulary(key for key in compositions if key is not None)
+        self.composition_ids = np.fromiter(
+            (self.compositions.ids[key] if key is not None else -1 for key in compositions),
+            dtype=np.int32,
+            count=len(compositions)
+        )
+
+        self.units = Vocabulary(unit_names)
+        self.unit_ids = self.units.encode(unit_names)
+        self.unit_offsets = _offsets(unit_counts)
+
+        self.traits = Vocabulary(trait_names)
+        self.trait_ids = self.traits.encode(trait_names)
+        self.trait_offsets = _offsets(trait_counts)
+
+        self.items = Vocabulary(item_names)
+        self.item_ids = self.items.encode(item_names)
+        self.item_offsets = _offsets(item_counts)
+
+    def __len__(self):
+        return len(self.placement)
+
+
+def _offsets(counts: List[int]) -> np.ndarray:
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return offsets
+
+
+def _owner_index(offsets: np.ndarray) -> np.ndarray:
+    # Index du parent (match ou unité) de chaque occurrence
+    return np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+
+
+def _ranked(ids: np.ndarray, size: int, placement: np.ndarray, top4: np.ndarray, top: Optional[int]) -> List[tuple]:
+    games = np.bincount(ids, minlength=size)
+    wins = np.bincount(ids, weights=top4, minlength=size).astype(np.int64)
+    placement_sum = np.bincount(ids, weights=placement, minlength=size).astype(np.int64)
+
+    present = np.flatnonzero(games)
+    # Tri par parties décroissantes puis par nom (= id croissant)
+    order = present[np.lexsort((present, -games[present]))]
+    if top is not None:
+        order = order[:top]
+    return [(int(i), int(games[i]), int(wins[i]), int(placement_sum[i])) for i in order]
+
+
+def composition_stats(columns: MatchColumns) -> List[dict]:
+    valid = columns.composition_ids >= 0
+    ranked = _ranked(
+        columns.composition_ids[valid],
+        len(columns.compositions),
+        columns.placement[valid],
+        columns.top4[valid],
+        None
+    )
+    return [
+        {
+            "composition": columns.compositions.names[i],
+            "games_played": games,
+            "wins": wins,
+            "win_rate": round((wins / games) * 100, 2),
+            "avg_placement": round(placement_sum / games, 2)
+        }
+        for i, games, wins, placement_sum in ranked
+    ]
+
+
+def top_units(columns: MatchColumns, top: int = 5) -> List[dict]:
+    owner = _owner_index(columns.unit_offsets)
+    ranked = _ranked(columns.unit_ids, len(columns.units), columns.placement[owner], columns.top4[owner], top)
+    return [
+        {
+            "character_id": columns.units.names[i],
+            "count": games,
+            "winrate": round((wins / games) * 100, 2)
+        }
+        for i, games, wins, _ in ranked
+    ]
+
+
+def top_traits(columns: MatchColumns, top: int = 5) -> List[dict]:
+    owner = _owner_index(columns.trait_offsets)
+    ranked = _ranked(columns.trait_ids, len(columns.traits), columns.placement[owner], columns.top4[owner], top)
+    return [
+        {
+            "name": strip_set_prefix(columns.traits.names[i]),
+            "count": games,
+            "winrate": round((wins / games) * 100, 2)
+        }
+        for i, games, wins, _ in ranked
+    ]
+
+
+def unit_item_stats(columns: MatchColumns, character_id: str = None, top: int = 3) -> List[dict]:
+    """
+    Items les plus joués par unité (ou pour une seule unité), avec leur taux de top 4.
+    Chaque couple (unité, item) est encodé en un entier pour un seul bincount.
+    """
+    if not len(columns.items):
+        return []
+
+    item_unit = columns.unit_ids[_owner_index(columns.item_offsets)]
+    item_match = _owner_index(columns.unit_offsets)[_owner_index(columns.item_offsets)]
+    item_ids = columns.item_ids
+
+    if character_id is not None:
+        unit_id = columns.units.ids.get(character_id)
+        if unit_id is None:
+            return []
+        selected = item_unit == unit_id
+        item_unit, item_match, item_ids = item_unit[selected], item_match[selected], item_ids[selected]
+
+    n_items = len(columns.items)
+    pairs = item_unit.astype(np.int64) * n_items + item_ids
+    games = np.bincount(pairs, minlength=len(columns.units) * n_items)
+    wins = np.bincount(pairs, weights=columns.top4[item_match], minlength=len(games)).astype(np.int64)
+
+    result = []
+    for unit_id in np.unique(item_unit):
+        unit_games = games[unit_id * n_items:(unit_id + 1) * n_items]
+        present = np.flatnonzero(unit_games)
+        order = present[np.lexsort((present, -unit_games[present]))][:top]
+        for item_id in order:
+            pair = unit_id * n_items + item_id
+            count, win_count = int(games[pair]), int(wins[pair])
+            result.append({
+                "character_id": columns.units.names[unit_id],
+                "item": columns.items.names[item_id],
+                "count": count,
+                "winrate": round((win_count / count) * 100, 2)
+            })
+    return result
+
+
+def load_user_columns(db: Session, user_id: int, filters=None) -> MatchColumns:
+    """
+    Charge une seule fois l'historique filtré d'un joueur en colonnes.
+    """
+    query = db.query(Match.placement, Match.stats_key, Match.board, Match.legacy_traits, Match.legacy_units)
+    rows = filter_matches(query, user_id, filters or StatsFilters()).all()
+    # Noms manquants chargés par la session appelante (celle de la route sous run_sync)
+    catalog.load_missing(db, [row.board for row in rows])
+    return MatchColumns(
+        (placement, stats_key, *match_board(board, legacy_traits, legacy_units))
+        for placement, stats_key, board, legacy_traits, legacy_units in rows
+    )
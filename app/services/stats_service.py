@@ -0,0 +1,182 @@
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import List, Optional
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+from app.models.match import Match
+from app.models.match_unit import MatchUnit
+from app.models.match_trait import MatchTrait
+from app.models.user_stat import UserStat
+from app.models.user_daily_stat import UserDailyStat
+from app.services.composition import strip_set_prefix
+from app.services.aggregate_service import AGGREGATE_KINDS
+
+
+@dataclass
+class StatsFilters:
+    """
+    Filtres communs aux endpoints de stats (paramètres de requête).
+    since / until sont des jours inclus.
+    """
+    since: Optional[date] = None
+    until: Optional[date] = None
+    patch: Optional[str] = None
+    set_number: Optional[int] = None
+
+    @property
+    def has_window(self) -> bool:
+        return self.since is not None or self.until is not None
+
+    @property
+    def needs_scan(self) -> bool:
+        # patch et set ne sont pas dans les agrégats : on repasse par les tables de matchs
+        return self.patch is not None or self.set_number is not None
+
+
+def filter_matches(query, user_id: int, filters: StatsFilters):
+    query = query.filter(Match.user_id == user_id)
+    # Bornes sur played_at : parcours d'intervalle sur l'index (user_id, played_at)
+    if filters.since is not None:
+        query = query.filter(Match.played_at >= datetime.combine(filters.since, time.min))
+    if filters.until is not None:
+        query = query.filter(Match.played_at < datetime.combine(filters.until + timedelta(days=1), time.min))
+    if filters.patch is not None:
+        query = query.filter(Match.patch == filters.patch)
+    if filters.set_number is not None:
+        query = query.filter(Match.set_number == filters.set_number)
+    return query
+
+
+def _scan_query(db: Session, kind: str):
+    wins = func.sum(case((Match.placement <= 4, 1), else_=0))
+    placements = func.sum(Match.placement)
+
+    if kind == "composition":
+        key = Match.stats_key
+        query = db.query(key, func.count(Match.id), wins, placements).filter(key.isnot(None))
+    elif kind == "unit":
+        key = MatchUnit.character_id
+        query = db.query(key, func.count(MatchUnit.id), wins, placements).join(Match, Match.id == MatchUnit.match_pk)
+    else:
+        key = MatchTrait.name
+        query = db.query(key, func.count(MatchTrait.id), wins, placements).join(Match, Match.id == MatchTrait.match_pk)
+    return query, key
+
+
+def fetch_stats(db: Session, user_id: int, kind: str, filters: StatsFilters = None, limit: int = None) -> List[tuple]:
+    """
+    Compteurs (key, games, top4, placement_sum) d'un type d'agrégat, triés par nombre de parties.
+    - sans filtre : user_stats, une ligne par clé
+    - fenêtre de dates seule : somme des buckets journaliers de user_daily_stats
+    - patch / set : GROUP BY sur matches et les tables normalisées
+    """
+    filters = filters or StatsFilters()
+
+    if filters.needs_scan:
+        query, key = _scan_query(db, kind)
+        query = filter_matches(query, user_id, filters).group_by(key)
+        games = func.count()
+    elif filters.has_window:
+        key = UserDailyStat.key
+        games = func.sum(UserDailyStat.games)
+        query = (
+            db.query(key, games, func.sum(UserDailyStat.top4), func.sum(UserDailyStat.placement_sum))
+            .filter(UserDailyStat.user_id == user_id, UserDailyStat.kind == kind)
+        )
+        if filters.since is not None:
+            query = query.filter(UserDailyStat.day >= filters.since)
+        if filters.until is not None:
+            query = query.filter(UserDailyStat.day <= filters.until)
+        query = query.group_by(key)
+    else:
+        key = UserStat.key
+        games = UserStat.games
+        query = (
+            db.query(key, games, UserStat.top4, UserStat.placement_sum)
+            .filter(UserStat.user_id == user_id, UserStat.kind == kind, UserStat.games > 0)
+        )
+
+    query = query.order_by(games.desc(), key)
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
+
+
+def fetch_dashboard(db: Session, user_id: int, filters: StatsFilters = None, top: int = 5) -> dict:
+    """
+    Compositions, top unités et top traits en une seule requête d'agrégats
+    (une requête par type seulement pour les filtres patch / set).
+    """
+    filters = filters or StatsFilters()
+
+    if filters.needs_scan:
+        by_kind = {kind: fetch_stats(db, user_id, kind, filters) for kind in AGGREGATE_KINDS}
+    else:
+        if filters.has_window:
+            query = (
+                db.query(
+                    UserDailyStat.kind,
+                    UserDailyStat.key,
+                    func.sum(UserDailyStat.games),
+                    func.sum(UserDailyStat.top4),
+                    func.sum(UserDailyStat.placement_sum)
+                )
+                .filter(UserDailyStat.user_id == user_id)
+            )
+            if filters.since is not None:
+                query = query.filter(UserDailyStat.day >= filters.since)
+            if filters.until is not None:
+                query = query.filter(UserDailyStat.day <= filters.until)
+            query = query.group_by(UserDailyStat.kind, UserDailyStat.key)
+        else:
+            query = (
+                db.query(UserStat.kind, UserStat.key, UserStat.games, UserStat.top4, UserStat.placement_sum)
+                .filter(UserStat.user_id == user_id, UserStat.games > 0)
+            )
+
+        by_kind = {kind: [] for kind in AGGREGATE_KINDS}
+        for kind, key, games, top4, placement_sum in query:
+            by_kind[kind].append((key, games, top4, placement_sum))
+        for stats in by_kind.values():
+            stats.sort(key=lambda stat: (-stat[1], stat[0]))
+
+    return {
+        "compositions": format_composition_stats(by_kind["composition"]),
+        "top_units": format_unit_stats(by_kind["unit"][:top]),
+        "top_traits": format_trait_stats(by_kind["trait"][:top])
+    }
+
+
+def format_composition_stats(stats: List[tuple]) -> List[dict]:
+    return [
+        {
+            "composition": key,
+            "games_played": games,
+            "wins": wins,
+            "win_rate": round((wins / games) * 100, 2),
+            "avg_placement": round(placement_sum / games, 2)
+        }
+        for key, games, wins, placement_sum in stats
+    ]
+
+
+def format_unit_stats(stats: List[tuple]) -> List[dict]:
+    return [
+        {
+            "character_id": key,
+            "count": games,
+            "winrate": round((wins / games) * 100, 2) if games > 0 else 0.0
+        }
+        for key, games, wins, _ in stats
+    ]
+
+
+def format_trait_stats(stats: List[tuple]) -> List[dict]:
+    return [
+        {
+            "name": strip_set_prefix(key),
+            "count": games,
+            "winrate": round((wins / games) * 100, 2) if games > 0 else 0.0
+        }
+        for key, games, wins, _ in stats
+    ]
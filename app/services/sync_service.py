@@ -0,0 +1,149 @@
+import logging
+import time
+from datetime import datetime, timedelta
+from threading import Event, Lock, Thread
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.match import Match
+from app.models.user import User
+from app.models.sync_state import SyncState
+from app.services.riot_service import get_recent_match_ids, ingest_match_ids
+
+logger = logging.getLogger(__name__)
+
+# startTime porte sur le début de partie alors que played_at est la fin :
+# on repart un peu avant le curseur, les doublons sont ignorés à l'ingestion
+CURSOR_OVERLAP = timedelta(hours=1)
+
+
+def sync_user(db: Session, user: User) -> int:
+    """
+    Ingère les matchs de l'utilisateur plus récents que son curseur.
+    Les pages d'ids sont parcourues jusqu'à une page incomplète : le curseur n'avance
+    qu'une fois tout l'intervalle ingéré, sinon les matchs plus anciens seraient sautés.
+    Retourne le nombre de lignes insérées (tous joueurs liés du lobby confondus).
+    """
+    state = db.get(SyncState, user.id)
+    if state is None:
+        state = SyncState(user_id=user.id, matches_synced=0)
+        db.add(state)
+
+    cursor = state.last_played_at or db.query(func.max(Match.played_at)).filter(Match.user_id == user.id).scalar()
+    start_time = int((cursor - CURSOR_OVERLAP).timestamp()) if cursor else None
+
+    inserted = 0
+    try:
+        start = 0
+        while True:
+            match_ids = get_recent_match_ids(
+                user.puuid, user.region, count=settings.SYNC_MATCH_COUNT, start=start, start_time=start_time
+            )
+            inserted += ingest_match_ids(db, user.puuid, user.region, match_ids)["inserted"]
+            start += len(match_ids)
+            # Sans curseur (premier passage), seule la page la plus récente : l'historique est le rôle du backfill
+            if len(match_ids) < settings.SYNC_MATCH_COUNT or start_time is None:
+                break
+
+        state.last_played_at = db.query(func.max(Match.played_at)).filter(Match.user_id == user.id).scalar()
+        state.last_status = "ok"
+        state.last_error = None
+    except Exception as e:
+        db.rollback()
+        state = db.merge(state)
+        state.last_status = "error"
+        state.last_error = str(e)[:500]
+
+    # Les pages déjà ingérées sont committées : elles comptent même si une page suivante échoue
+    state.matches_synced += inserted
+    state.last_sync_at = datetime.utcnow()
+    db.commit()
+    return inserted
+
+
+class SyncWorker:
+    """
+    Parcourt périodiquement les utilisateurs liés et synchronise leurs matchs
+    via un pool de threads, pour que les endpoints de lecture ne servent que la base.
+    """
+
+    def __init__(self, interval: int, workers: int):
+        self.interval = interval
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sync")
+        self._pending = set()
+        self._lock = Lock()
+        self._stop = Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = Thread(target=self._run, name="sync-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def is_pending(self, user_id: int) -> bool:
+        with self._lock:
+            return user_id in self._pending
+
+    def request_sync(self, user_id: int, force: bool = False) -> bool:
+        """
+        Planifie la synchronisation d'un utilisateur (ignoré s'il est déjà en file,
+        ou si la synchronisation est désactivée).
+        Sans force, un utilisateur synchronisé depuis moins d'un intervalle est ignoré :
+        consulter l'historique ne coûte pas d'appel Riot à chaque page vue.
+        """
+        if not settings.SYNC_ENABLED:
+            return False
+        with self._lock:
+            if user_id in self._pending:
+                return False
+            self._pending.add(user_id)
+        self._executor.submit(self._sync, user_id, force)
+        return True
+
+    def _sync(self, user_id: int, force: bool = False):
+        db = SessionLocal()
+        try:
+            user = db.get(User, user_id)
+            state = db.get(SyncState, user_id)
+            threshold = datetime.utcnow() - timedelta(seconds=self.interval)
+            recent = state is not None and state.last_sync_at is not None and state.last_sync_at >= threshold
+            if user and user.puuid and user.region and (force or not recent):
+                sync_user(db, user)
+        except Exception:
+            logger.exception("Erreur lors de la synchronisation de l'utilisateur %s", user_id)
+        finally:
+            db.close()
+            with self._lock:
+                self._pending.discard(user_id)
+
+    def _due_users(self):
+        threshold = datetime.utcnow() - timedelta(seconds=self.interval)
+        db = SessionLocal()
+        try:
+            return [
+                user_id
+                for (user_id,) in db.query(User.id)
+                .outerjoin(SyncState, SyncState.user_id == User.id)
+                .filter(User.puuid.isnot(None), User.region.isnot(None))
+                .filter(or_(SyncState.last_sync_at.is_(None), SyncState.last_sync_at < threshold))
+            ]
+        finally:
+            db.close()
+
+    def _run(self):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                for user_id in self._due_users():
+                    self.request_sync(user_id)
+            except Exception:
+                logger.exception("Erreur lors de la planification des synchronisations")
+            self._stop.wait(max(self.interval - (time.monotonic() - started), 1))
+
+
+sync_worker = SyncWorker(interval=settings.SYNC_INTERVAL_SECONDS, workers=settings.SYNC_WORKERS)
@@ -0,0 +1,9 @@
+import os
+
+# Les modules de l'app lisent leur configuration à l'import
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+os.environ.setdefault("RIOT_API_KEY", "benchmark")
+os.environ.setdefault("MATCH_STORE_DIR", os.path.join(os.path.dirname(__file__), ".match_store"))
@@ -0,0 +1,87 @@
+"""
+Chargement du dashboard, via l'application complète (TestClient) :
+- 3 appels /games/stats, /games/top-units, /games/top-traits (3 authentifications + 3 requêtes de stats)
+- 1 appel /games/dashboard
+
+Mesuré cache de réponses vidé à chaque tour (calcul complet), puis servi depuis le cache.
+Base SQLite temporaire remplie de matchs synthétiques.
+
+Usage : python -m benchmarks.bench_dashboard [nombre_de_matchs]
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+from pathlib import Path
+
+ROUNDS = 200
+SEPARATE_ROUTES = ["/games/stats", "/games/top-units", "/games/top-traits"]
+
+
+def seed(count: int) -> dict:
+    # Les modules de l'app lisent DATABASE_URL à l'import : après l'avoir fixé
+    from benchmarks.fake_riot import random_match
+    from app.core.database import SessionLocal
+    from app.models.user import User
+    from app.services.auth_service import create_access_token
+    from app.services.riot_service import build_match_row, ingest_matches
+
+    db = SessionLocal()
+    try:
+        db.add(User(id=1, role_id=2, email="bench@example.com", username="bench", hashed_password="x", puuid="bench-puuid"))
+        db.commit()
+
+        rng = random.Random(42)
+        rows = [
+            build_match_row(random_match(f"EUW1_{i}", "bench-puuid", rng, day=i % 90), "bench-puuid", 1)
+            for i in range(count)
+        ]
+        ingest_matches(db, rows)
+    finally:
+        db.close()
+
+    token = create_access_token({"sub": "bench", "uid": 1, "role": "user"})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def timed(client, headers: dict, routes: list, cached: bool) -> float:
+    from app.services.response_cache import response_cache
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        if not cached:
+            response_cache.clear()
+        for route in routes:
+            client.get(route, headers=headers).raise_for_status()
+    return (time.perf_counter() - start) / ROUNDS
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["DATABASE_URL"] = f"sqlite:///{Path(directory) / 'dashboard.db'}"
+        os.environ["SYNC_ENABLED"] = "false"
+        os.environ["MATCH_STORE_DIR"] = str(Path(directory) / "store")
+
+        from fastapi.testclient import TestClient
+        import main as app_main
+
+        headers = seed(count)
+        client = TestClient(app_main.app)
+        results = {
+            cached: (timed(client, headers, SEPARATE_ROUTES, cached), timed(client, headers, ["/games/dashboard"], cached))
+            for cached in (False, True)
+        }
+
+    print(f"matchs             : {count}")
+    for cached, label in [(False, "sans cache"), (True, "avec cache")]:
+        separate, dashboard = results[cached]
+        print(f"{label} :")
+        print(f"  3 appels séparés : {separate * 1000:.2f} ms")
+        print(f"  /games/dashboard : {dashboard * 1000:.2f} ms (x{separate / dashboard:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Débit d'écriture des matchs (lignes / seconde) :
+- chemin d'origine : SELECT + INSERT + COMMIT par match
+- ingest_matches   : INSERT ... ON CONFLICT DO NOTHING par lots, une transaction
+Compare aussi la taille du plateau stocké : JSON d'origine contre encodage catalogue.
+
+Usage : python -m benchmarks.bench_ingest [nombre_de_matchs]
+"""
+import sys
+import time
+import tempfile
+from pathlib import Path
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+from benchmarks.fake_riot import fake_match
+from app.core.database import Base
+from app.models import user, role, match
+from app.models.match import Match
+from app.services.riot_service import build_match_row, ingest_matches
+
+
+def legacy_store(db, row: dict):
+    if db.query(Match).filter_by(match_id=row["match_id"]).first():
+        return
+    # Stockage d'origine : traits / units en JSON
+    values = {k: v for k, v in row.items() if k not in ("traits", "units")}
+    db.add(Match(**values, legacy_traits=row["traits"], legacy_units=row["units"]))
+    db.commit()
+
+
+def fresh_session(directory: str, name: str):
+    engine = create_engine(f"sqlite:///{Path(directory) / name}")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rows = [build_match_row(fake_match(f"EUW1_{i}"), "bench-puuid", 1) for i in range(count)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        db = fresh_session(directory, "legacy.db")
+        legacy = timed(lambda: [legacy_store(db, row) for row in rows])
+        json_bytes = db.query(func.sum(func.length(Match.legacy_traits) + func.length(Match.legacy_units))).scalar()
+        db.close()
+
+        db = fresh_session(directory, "bulk.db")
+        bulk = timed(lambda: ingest_matches(db, rows))
+        replay = timed(lambda: ingest_matches(db, rows))
+        board_bytes = db.query(func.sum(func.length(Match.board))).scalar()
+        db.close()
+
+    print(f"matchs                    : {count}")
+    print(f"SELECT+INSERT+COMMIT      : {count / legacy:,.0f} lignes/s")
+    print(f"ingest_matches            : {count / bulk:,.0f} lignes/s (x{legacy / bulk:.1f})")
+    print(f"ingest_matches (doublons) : {count / replay:,.0f} lignes/s")
+    print(f"plateau JSON              : {json_bytes / count:,.0f} octets/match")
+    print(f"plateau encodé            : {board_bytes / count:,.0f} octets/match (x{json_bytes / board_bytes:.1f})")
+
+
+if __name__ == "__main__":
+    main()
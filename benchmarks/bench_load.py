@@ -0,0 +1,131 @@
+"""
+Test de charge HTTP : N clients concurrents sur des routes authentifiées
+(/users/me, /riot/sync, /riot/history, /games/dashboard) servies par uvicorn.
+Débit et latences p50 / p99 par niveau de concurrence.
+
+Pour comparer deux versions (routes sync / async), lancer le même test sur
+chaque arbre : python -m benchmarks.bench_load --app-dir <chemin> [concurrences...]
+
+Usage : python -m benchmarks.bench_load [--app-dir .] [concurrence ...]
+BENCH_DATABASE_URL peut pointer vers PostgreSQL (par défaut : SQLite dans un dossier temporaire) ;
+il est transmis au serveur comme DATABASE_URL.
+"""
+import os
+import sys
+import time
+import random
+import socket
+import tempfile
+import subprocess
+import requests
+from pathlib import Path
+from statistics import quantiles
+from concurrent.futures import ThreadPoolExecutor
+
+USERS = 20
+MATCHES_PER_USER = 200
+REQUESTS_PER_CLIENT = 50
+# Le serveur tourne avec SYNC_ENABLED=false : /riot/history ne planifie aucune
+# synchronisation (ni appel Riot ni écriture), seule la lecture en base est mesurée
+ROUTES = ["/users/me", "/riot/sync", "/riot/history?limit=20", "/games/dashboard"]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(app_dir: str, database_url: str, store_dir: str) -> tuple:
+    port = free_port()
+    env = {**os.environ, "DATABASE_URL": database_url, "SYNC_ENABLED": "false", "MATCH_STORE_DIR": store_dir}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=app_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            requests.get(base_url, timeout=1)
+            return process, base_url
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("Le serveur n'a pas démarré")
+
+
+def seed(base_url: str) -> list:
+    # Les modules de l'app lisent DATABASE_URL à l'import : après l'avoir fixé
+    from benchmarks.fake_riot import random_match
+    from app.core.database import SessionLocal
+    from app.models import user, role, match
+    from app.models.user import User
+    from app.services.riot_service import build_lobby_rows, ingest_matches
+
+    tokens = []
+    for i in range(USERS):
+        username = f"bench{i}"
+        requests.post(f"{base_url}/auth/register", json={"email": f"{username}@bench.fr", "username": username, "password": "bench"})
+        response = requests.post(f"{base_url}/auth/login", json={"identifier": username, "password": "bench"})
+        tokens.append(response.json()["access token"])
+
+    db = SessionLocal()
+    try:
+        rng = random.Random(1)
+        for i in range(USERS):
+            db.query(User).filter(User.username == f"bench{i}").update({"puuid": f"bench-puuid-{i}", "region": "europe"})
+            db.commit()
+            matches = [random_match(f"EUW1_{i}_{j}", f"bench-puuid-{i}", rng, day=j % 60) for j in range(MATCHES_PER_USER)]
+            ingest_matches(db, build_lobby_rows(db, matches))
+    finally:
+        db.close()
+    return tokens
+
+
+def client(base_url: str, token: str, seed_value: int) -> list:
+    rng = random.Random(seed_value)
+    session = requests.Session()
+    session.headers["Authorization"] = f"Bearer {token}"
+    latencies = []
+    for _ in range(REQUESTS_PER_CLIENT):
+        start = time.perf_counter()
+        response = session.get(base_url + rng.choice(ROUTES))
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def run(base_url: str, tokens: list, concurrency: int) -> tuple:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda i: client(base_url, tokens[i % len(tokens)], i), range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies = [latency for result in results for latency in result]
+    cuts = quantiles(latencies, n=100)
+    return len(latencies) / elapsed, cuts[49], cuts[98]
+
+
+def main():
+    args = sys.argv[1:]
+    app_dir = "."
+    if args[:1] == ["--app-dir"]:
+        app_dir, args = args[1], args[2:]
+    levels = [int(level) for level in args] or [10, 50, 200]
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_url = os.environ.get("BENCH_DATABASE_URL") or f"sqlite:///{Path(directory) / 'load.db'}"
+        os.environ["DATABASE_URL"] = database_url
+        process, base_url = start_server(str(Path(app_dir).resolve()), database_url, str(Path(directory) / "store"))
+        try:
+            tokens = seed(base_url)
+            print(f"{'clients':>8} | {'req/s':>8} | {'p50':>8} | {'p99':>8}")
+            for concurrency in levels:
+                throughput, p50, p99 = run(base_url, tokens, concurrency)
+                print(f"{concurrency:>8} | {throughput:>8,.0f} | {p50 * 1000:>6.1f}ms | {p99 * 1000:>6.1f}ms")
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Compare un rafraîchissement d'historique (1 liste d'ids + 10 matchs) :
+- en série avec requests.get (une connexion par appel, comportement d'origine)
+- via RiotClient (keep-alive + fan-out concurrent)
+
+Usage : python -m benchmarks.bench_riot_client [latence_en_secondes]
+"""
+import sys
+import time
+import requests
+from benchmarks.fake_riot import start_fake_riot
+from app.services.riot_client import RiotClient
+
+ROUNDS = 5
+
+
+def refresh_serial(base_url: str):
+    ids = requests.get(f"{base_url}/tft/match/v1/matches/by-puuid/bench/ids?count=10").json()
+    return [requests.get(f"{base_url}/tft/match/v1/matches/{match_id}").json() for match_id in ids]
+
+
+def refresh_client(client: RiotClient):
+    ids = client.get("europe", "/tft/match/v1/matches/by-puuid/bench/ids", params={"count": 10}).json()
+    return client.map(lambda match_id: client.get("europe", f"/tft/match/v1/matches/{match_id}").json(), ids)
+
+
+def timed(fn, *args) -> float:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        fn(*args)
+    return (time.perf_counter() - start) / ROUNDS
+
+
+def main():
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else 0.05
+    server, base_url = start_fake_riot(latency)
+    client = RiotClient(api_key="benchmark", base_url=base_url, pool_size=10, max_workers=5)
+
+    try:
+        serial = timed(refresh_serial, base_url)
+        pooled = timed(refresh_client, client)
+    finally:
+        client.close()
+        server.shutdown()
+
+    print(f"latence simulée      : {latency * 1000:.0f} ms")
+    print(f"série (requests.get) : {serial * 1000:.1f} ms / rafraîchissement")
+    print(f"RiotClient           : {pooled * 1000:.1f} ms / rafraîchissement")
+    print(f"gain                 : x{serial / pooled:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Moteur de stats vectorisé (stats_engine) contre les implémentations de référence
+en Python pur (compute_stats_by_traits, compute_top_units, compute_top_traits).
+Vérifie l'équivalence des résultats puis mesure 1k, 10k et 100k matchs.
+
+Usage : python -m benchmarks.bench_stats_engine [tailles...]
+"""
+import sys
+import time
+import random
+from types import SimpleNamespace
+from benchmarks.fake_riot import random_match
+from app.services.riot_service import build_match_row, compute_stats_by_traits, compute_top_units, compute_top_traits
+from app.services.stats_engine import MatchColumns, composition_stats, top_units, top_traits, unit_item_stats
+
+
+def synthetic_history(count: int) -> list:
+    rng = random.Random(count)
+    return [
+        SimpleNamespace(**build_match_row(random_match(f"EUW1_{i}", "bench-puuid", rng), "bench-puuid", 1))
+        for i in range(count)
+    ]
+
+
+def reference(matches: list) -> dict:
+    return {
+        "compositions": compute_stats_by_traits(matches),
+        "units": compute_top_units(matches),
+        "traits": compute_top_traits(matches)
+    }
+
+
+def vectorized(columns: MatchColumns) -> dict:
+    return {
+        "compositions": composition_stats(columns),
+        "units": top_units(columns),
+        "traits": top_traits(columns)
+    }
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    sizes = [int(size) for size in sys.argv[1:]] or [1_000, 10_000, 100_000]
+
+    print(f"{'matchs':>8} | {'référence':>10} | {'colonnes':>10} | {'vectorisé':>10} | {'items/unité':>11} | gain")
+    for count in sizes:
+        matches = synthetic_history(count)
+        rows = [(m.placement, m.stats_key, m.traits, m.units) for m in matches]
+
+        expected, reference_time = timed(reference, matches)
+        columns, load_time = timed(MatchColumns, rows)
+        result, engine_time = timed(vectorized, columns)
+        _, items_time = timed(unit_item_stats, columns)
+
+        expected["compositions"].sort(key=lambda stat: (-stat["games_played"], stat["composition"]))
+        assert result == expected, f"résultats divergents pour {count} matchs"
+
+        print(
+            f"{count:>8} | {reference_time * 1000:>8.1f}ms | {load_time * 1000:>8.1f}ms | "
+            f"{engine_time * 1000:>8.1f}ms | {items_time * 1000:>9.1f}ms | x{reference_time / engine_time:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
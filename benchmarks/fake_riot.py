@@ -0,0 +1,105 @@
+"""
+Faux serveur Riot local pour les benchmarks (aucun quota consommé).
+Chaque requête est servie après une latence artificielle pour simuler l'aller-retour réseau.
+"""
+import json
+import random
+import re
+import time
+from threading import Thread
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+MATCH_IDS_RE = re.compile(r"^/tft/match/v1/matches/by-puuid/(?P<puuid>[^/]+)/ids$")
+MATCH_RE = re.compile(r"^/tft/match/v1/matches/(?P<match_id>[^/?]+)$")
+
+
+def fake_match(match_id: str, puuid: str = "bench-puuid") -> dict:
+    return {
+        "metadata": {"match_id": match_id, "participants": [puuid]},
+        "info": {
+            "game_datetime": 1_700_000_000_000,
+            "game_version": "Version 14.23.632.1234",
+            "tft_set_number": 13,
+            "participants": [
+                {
+                    "puuid": puuid,
+                    "placement": 3,
+                    "level": 8,
+                    "gold_left": 2,
+                    "last_round": 33,
+                    "traits": [
+                        {"name": "TFT13_Challenger", "tier_current": 2, "num_units": 4},
+                        {"name": "TFT13_Bruiser", "tier_current": 1, "num_units": 2},
+                    ],
+                    "units": [
+                        {"character_id": "TFT13_Ambessa", "tier": 2, "itemsName": ["TFT_Item_Bloodthirster"]},
+                        {"character_id": "TFT13_Vi", "tier": 2, "itemsName": []},
+                    ],
+                }
+            ],
+        },
+    }
+
+
+TRAITS = [f"TFT13_Trait{i}" for i in range(28)]
+UNITS = [f"TFT13_Unit{i}" for i in range(60)]
+ITEMS = [f"TFT_Item_{i}" for i in range(45)]
+
+
+def random_match(match_id: str, puuid: str, rng: random.Random, day: int = 0) -> dict:
+    """
+    Match synthétique aux traits / unités / items variés pour les benchmarks de stats.
+    """
+    match = fake_match(match_id, puuid)
+    participant = match["info"]["participants"][0]
+    match["info"]["game_datetime"] += day * 86_400_000
+    participant["placement"] = rng.randint(1, 8)
+    participant["traits"] = [
+        {"name": name, "tier_current": rng.randint(1, 4), "num_units": rng.randint(2, 8)}
+        for name in rng.sample(TRAITS, rng.randint(4, 9))
+    ]
+    participant["units"] = [
+        {"character_id": name, "tier": rng.randint(1, 3), "itemsName": rng.sample(ITEMS, rng.randint(0, 3))}
+        for name in rng.sample(UNITS, rng.randint(7, 10))
+    ]
+    return match
+
+
+def make_handler(latency: float):
+    class FakeRiotHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Sans TCP_NODELAY, en-têtes et corps écrits séparément déclenchent l'ACK retardé (~40 ms) en keep-alive
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            time.sleep(latency)
+            path = self.path.split("?", 1)[0]
+
+            if m := MATCH_IDS_RE.match(path):
+                body = [f"EUW1_{i}" for i in range(10)]
+            elif m := MATCH_RE.match(path):
+                body = fake_match(m.group("match_id"))
+            else:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            payload = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    return FakeRiotHandler
+
+
+def start_fake_riot(latency: float = 0.05):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(latency))
+    Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    return server, f"http://{host}:{port}"
@@ -1,14 +1,25 @@
 from fastapi import FastAPI
+from sqlalchemy import inspect
 from sqlalchemy.orm import Session
-from app.core.database import Base, engine
+from app.core.database import Base, engine, async_engine
+from app.core.migrations import run_migrations
+from app.core.config import settings
+from app.core.metrics import MetricsMiddleware
 from app.models.role import Role
-from app.routers import auth, admin, users, riot, games
-from app.models import user, role, match
+from app.routers import auth, admin, users, riot, games, metrics
+from app.models import user, role, match, match_unit, match_trait, user_stat, user_daily_stat, sync_state, backfill_job, catalog_entry
+from app.services.sync_service import sync_worker
+from app.services.backfill_service import backfill_runner
+from app.services.password_hasher import password_hasher
+from app.services.catalog import catalog
 
 app = FastAPI()
+app.add_middleware(MetricsMiddleware)
 
-# Crée les tables au démarrage (à remplacer par Alembic plus tard)
+# Crée les tables au démarrage puis applique les migrations (à remplacer par Alembic plus tard)
+fresh_database = not inspect(engine).has_table("matches")
 Base.metadata.create_all(bind=engine)
+run_migrations(engine, fresh_database)
 
 @app.get("/")
 def read_root():
@@ -19,6 +30,26 @@ app.include_router(admin.router)
 app.include_router(users.router)
 app.include_router(riot.router)
 app.include_router(games.router)
+app.include_router(metrics.router)
+
+@app.on_event("startup")
+def start_background_jobs():
+    # Catalogue en mémoire : décodage sans requête et pas de réinsertion des noms connus
+    catalog.load()
+    if settings.SYNC_ENABLED:
+        sync_worker.start()
+    # Reprend les backfills interrompus depuis leur checkpoint
+    backfill_runner.resume_pending()
+
+@app.on_event("shutdown")
+def stop_background_jobs():
+    sync_worker.stop()
+    backfill_runner.stop()
+    password_hasher.shutdown()
+
+@app.on_event("shutdown")
+async def close_async_engine():
+    await async_engine.dispose()
 
 def seed_roles():
     db = Session(bind=engine)
@@ -0,0 +1,8 @@
+import os
+
+# Configuration minimale pour importer app.* sans .env (aucune connexion n'est ouverte)
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+os.environ.setdefault("RIOT_API_KEY", "test-key")
@@ -0,0 +1,128 @@
+"""
+Équivalence du moteur de stats vectorisé (stats_engine) avec les implémentations
+de référence en Python pur de riot_service.
+"""
+import random
+from collections import Counter
+from types import SimpleNamespace
+import pytest
+from benchmarks.fake_riot import random_match
+from app.services.riot_service import build_match_row, compute_stats_by_traits, compute_top_units, compute_top_traits
+from app.services.stats_engine import MatchColumns, composition_stats, top_units, top_traits, unit_item_stats
+
+
+def trait(name: str, tier: int = 1) -> dict:
+    return {"name": name, "tier_current": tier, "num_units": 2}
+
+
+def unit(character_id: str, *items: str) -> dict:
+    return {"character_id": character_id, "tier": 1, "items": list(items)}
+
+
+def match(placement: int, traits: list, units: list) -> SimpleNamespace:
+    # stats_key à None : MatchColumns reclasse les traits, comme pour une ligne pas encore migrée
+    return SimpleNamespace(placement=placement, stats_key=None, traits=traits, units=units)
+
+
+def random_history(count: int, seed: int) -> list:
+    rng = random.Random(seed)
+    return [
+        SimpleNamespace(**build_match_row(random_match(f"EUW1_{i}", "test-puuid", rng, day=i % 30), "test-puuid", 1))
+        for i in range(count)
+    ]
+
+
+def tied_history() -> list:
+    # Chaque nom apparaît le même nombre de fois, insérés en ordre inverse de l'ordre alphabétique
+    return [
+        match(2, [trait("TFT13_Zeta"), trait("TFT13_Alpha")], [unit("TFT13_Zed", "TFT_Item_B", "TFT_Item_A"), unit("TFT13_Ahri", "TFT_Item_B")]),
+        match(7, [trait("TFT13_Alpha"), trait("TFT13_Zeta")], [unit("TFT13_Ahri", "TFT_Item_A"), unit("TFT13_Zed")]),
+        match(4, [trait("TFT13_Mid", 2)], [unit("TFT13_Mordo", "TFT_Item_C")]),
+        match(5, [trait("TFT13_Mid", 2)], [unit("TFT13_Mordo", "TFT_Item_C")]),
+    ]
+
+
+def columns_of(matches: list) -> MatchColumns:
+    return MatchColumns([(m.placement, m.stats_key, m.traits, m.units) for m in matches])
+
+
+def reference_unit_items(matches: list, character_id: str = None, top: int = 3) -> list:
+    counts, wins = Counter(), Counter()
+    for m in matches:
+        for u in m.units:
+            if character_id is not None and u["character_id"] != character_id:
+                continue
+            for item in u.get("items") or []:
+                counts[(u["character_id"], item)] += 1
+                if m.placement <= 4:
+                    wins[(u["character_id"], item)] += 1
+
+    result = []
+    for cid in sorted({cid for cid, _ in counts}):
+        ranked = sorted(((item, count) for (c, item), count in counts.items() if c == cid), key=lambda pair: (-pair[1], pair[0]))
+        for item, count in ranked[:top]:
+            result.append({
+                "character_id": cid,
+                "item": item,
+                "count": count,
+                "winrate": round((wins[(cid, item)] / count) * 100, 2)
+            })
+    return result
+
+
+def sorted_reference_compositions(matches: list) -> list:
+    # La référence ne trie pas : même ordre que le moteur (parties décroissantes, puis nom)
+    return sorted(compute_stats_by_traits(matches), key=lambda stat: (-stat["games_played"], stat["composition"]))
+
+
+@pytest.mark.parametrize("matches", [random_history(300, 7), tied_history(), random_history(50, 11) + tied_history()])
+def test_matches_reference(matches):
+    columns = columns_of(matches)
+
+    assert composition_stats(columns) == sorted_reference_compositions(matches)
+    assert top_units(columns) == compute_top_units(matches)
+    assert top_units(columns, top=50) == compute_top_units(matches, top=50)
+    assert top_traits(columns) == compute_top_traits(matches)
+    assert top_traits(columns, top=50) == compute_top_traits(matches, top=50)
+    assert unit_item_stats(columns) == reference_unit_items(matches)
+
+
+def test_unit_item_stats_for_one_unit():
+    matches = random_history(200, 3)
+    columns = columns_of(matches)
+    character_id = matches[0].units[0]["character_id"]
+
+    result = unit_item_stats(columns, character_id=character_id)
+    assert result == reference_unit_items(matches, character_id=character_id)
+    assert {entry["character_id"] for entry in result} == {character_id}
+    assert unit_item_stats(columns, character_id="TFT13_Unknown") == []
+
+
+def test_ties_are_ordered_by_name():
+    matches = tied_history()
+    columns = columns_of(matches)
+
+    assert [(stat["composition"], stat["games_played"]) for stat in composition_stats(columns)] == [
+        ("alpha zeta", 2),
+        ("mid", 2),
+    ]
+    assert [u["character_id"] for u in top_units(columns)] == ["TFT13_Ahri", "TFT13_Mordo", "TFT13_Zed"]
+    assert [t["name"] for t in top_traits(columns)] == ["alpha", "mid", "zeta"]
+    assert [(e["character_id"], e["item"], e["count"]) for e in unit_item_stats(columns)] == [
+        ("TFT13_Ahri", "TFT_Item_A", 1),
+        ("TFT13_Ahri", "TFT_Item_B", 1),
+        ("TFT13_Mordo", "TFT_Item_C", 2),
+        ("TFT13_Zed", "TFT_Item_A", 1),
+        ("TFT13_Zed", "TFT_Item_B", 1),
+    ]
+
+
+def test_empty_history():
+    columns = columns_of([])
+
+    assert len(columns) == 0
+    assert composition_stats(columns) == compute_stats_by_traits([]) == []
+    assert top_units(columns) == compute_top_units([]) == []
+    assert top_traits(columns) == compute_top_traits([]) == []
+    assert unit_item_stats(columns) == []
+    assert unit_item_stats(columns, character_id="TFT13_Ahri") == []